@@ -1,7 +1,6 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 import traceback
@@ -13,9 +12,14 @@ import uuid
 
 # Import custom components
 from components.chart_manager import ChartManager
+from components.decimation import DECIMATION_METHODS, BAR_AGGREGATIONS
+from components.time_pyramid import TimeSeriesPyramid
+from components.spectral import SPECTRAL_WINDOWS, DETREND_TYPES, NAN_POLICIES, PSD_AVERAGING
 from components.data_processor import DataProcessor
 from components.layout_manager import LayoutManager
 from components.export_manager import ExportManager
+from components.data_cache import DataCache
+from components.data_profiler import DataProfiler
 
 # --- Page Configuration ---
 st.set_page_config(
@@ -93,12 +97,115 @@ if 'data' not in st.session_state:
     st.session_state.data = None
 if 'chart_counter' not in st.session_state:
     st.session_state.chart_counter = 0
+if 'loaded_file' not in st.session_state:
+    st.session_state.loaded_file = None
 
 # --- Initialize Components ---
 chart_manager = ChartManager()
-data_processor = DataProcessor()
+data_processor = DataProcessor(cache=DataCache())
 layout_manager = LayoutManager()
 export_manager = ExportManager()
+data_profiler = DataProfiler()
+
+# --- Data Loading ---
+def requested_parameters() -> list:
+    """
+    Parameters selected across all charts, including edits made before this rerun.
+    """
+    params = []
+    for chart_id, config in st.session_state.charts.items():
+        params.extend(st.session_state.get(f"params_{chart_id}", config['parameters']))
+        # Cross-plots also need their x-axis parameter
+        x_axis = st.session_state.get(f"x_axis_{chart_id}", config.get('x_axis'))
+        if x_axis not in (None, 'Elapsed Time (s)', 'Timestamp'):
+            params.append(x_axis)
+    return list(dict.fromkeys(params))
+
+def load_projected_parameters(projection) -> pd.DataFrame:
+    """
+    Materialize the charted parameters from a column projection.
+    
+    Messages raised while loading new columns are shown as they happen;
+    earlier ones are replayed so the sidebar stays stable across reruns.
+    """
+    shown = len(projection.processor.messages)
+    with st.spinner("Loading parameters..."):
+        df = projection.load(requested_parameters())
+    df.attrs['source_key'] = st.session_state.loaded_file['fingerprint']
+    pyramid = st.session_state.loaded_file.get('pyramid')
+    if pyramid is not None:
+        pyramid.frame = df  # Newly loaded parameters join the pyramid lazily
+    for level, message in projection.processor.messages[:shown]:
+        getattr(st, level)(message)
+    return df
+
+def parameter_catalog() -> list:
+    """
+    Parameters offered for charting: the full header catalog when loading
+    on demand, otherwise the loaded columns.
+    """
+    loaded = st.session_state.loaded_file
+    if loaded is not None and loaded.get('projection') is not None:
+        return loaded['projection'].catalog
+    return [col for col in st.session_state.data.columns
+            if col not in ['Timestamp', 'Elapsed Time (s)']]
+
+def load_flight_data(uploaded_file, streaming: bool, max_memory_mb: float,
+                     compact: bool = False, on_demand: bool = False) -> pd.DataFrame:
+    """
+    Load an upload once and reuse the processed frame on later reruns.
+    
+    Reruns are keyed on the upload's content fingerprint, so widget changes
+    never re-parse the file. The messages emitted by the original load are
+    replayed so the sidebar shows the same diagnostics on every rerun.
+    
+    With ``on_demand`` only the header is read up front; the parameters
+    selected in the charts are parsed as they are requested.
+    """
+    upload_id = getattr(uploaded_file, 'file_id', None) or (uploaded_file.name, uploaded_file.size)
+    options = {'streaming': streaming, 'compact': compact, 'on_demand': on_demand}
+    loaded = st.session_state.loaded_file
+    
+    if loaded is None or loaded['upload_id'] != upload_id or loaded['options'] != options:
+        # Only hash the content when the upload itself changed
+        fingerprint = DataCache.make_key(uploaded_file.getvalue(), DataProcessor.version, options)
+        if loaded is not None and loaded['fingerprint'] == fingerprint:
+            loaded['upload_id'] = upload_id
+        else:
+            with st.spinner("Processing data..."):
+                uploaded_file.seek(0)
+                data_processor.compact_dtypes = compact
+                projection = None
+                if on_demand:
+                    projection = data_processor.open_projection(uploaded_file)
+                    df = projection.load(requested_parameters()) if projection is not None else pd.DataFrame()
+                elif streaming:
+                    store = data_processor.load_data_streaming(uploaded_file, max_memory_mb=max_memory_mb)
+                    df = store.to_dataframe() if store is not None else pd.DataFrame()
+                else:
+                    df = data_processor.load_data(uploaded_file)
+            # Lets per-dataset caches (profiles, figures) identify this upload
+            df.attrs['source_key'] = fingerprint
+            
+            st.session_state.loaded_file = {
+                'upload_id': upload_id,
+                'fingerprint': fingerprint,
+                'options': options,
+                'data': df,
+                'messages': list(data_processor.messages),
+                'diagnostics': dict(data_processor.diagnostics),
+                'projection': projection,
+                # Zoom levels live next to the frame; channels are aggregated on first use
+                'pyramid': TimeSeriesPyramid(df) if 'Elapsed Time (s)' in df.columns else None
+            }
+            return df
+    
+    if loaded.get('projection') is not None:
+        return load_projected_parameters(loaded['projection'])
+    
+    for level, message in loaded['messages']:
+        getattr(st, level)(message)
+    return loaded['data']
 
 # --- App Header ---
 st.markdown("""
@@ -120,14 +227,63 @@ with st.sidebar:
         help="CSV file with flight test data"
     )
     
+    with st.expander("⚙️ Ingest Options", expanded=False):
+        streaming_ingest = st.checkbox(
+            "Streaming ingest (large files)",
+            value=False,
+            help="Read the file in row chunks instead of all at once"
+        )
+        max_memory_mb = st.number_input(
+            "Chunk memory ceiling (MB)",
+            min_value=16,
+            max_value=4096,
+            value=256,
+            step=16,
+            disabled=not streaming_ingest
+        )
+        compact_dtypes = st.checkbox(
+            "Compact memory mode",
+            value=False,
+            help="Store analog channels as float32 and discrete flags as 1-byte integers where precision allows"
+        )
+        on_demand_ingest = st.checkbox(
+            "Load parameters on demand",
+            value=False,
+            help="Read only the header up front and load each parameter when a chart first uses it"
+        )
+
     if uploaded_file is not None:
-        # Process data
-        with st.spinner("Processing data..."):
-            df = data_processor.load_data(uploaded_file)
-            st.session_state.data = df
+        # Process data (memoized across reruns)
+        df = load_flight_data(uploaded_file, streaming_ingest, max_memory_mb, compact_dtypes,
+                              on_demand_ingest)
+        st.session_state.data = df
+        projection = st.session_state.loaded_file.get('projection')
+        chart_manager.set_pyramid(st.session_state.loaded_file.get('pyramid'))
         
         if not df.empty:
-            st.success(f"✅ Data loaded: {len(df)} points, {len(df.columns)-2} parameters")
+            if projection is not None:
+                st.success(f"✅ Data loaded: {len(df)} points, {len(projection.catalog)} parameters "
+                           f"({len(projection.loaded_columns)} loaded on demand)")
+            else:
+                st.success(f"✅ Data loaded: {len(df)} points, {len(df.columns)-2} parameters")
+            
+            # Malformed row diagnostics (one summary regardless of file size)
+            row_diagnostics = st.session_state.loaded_file['diagnostics'].get('rows', {})
+            if row_diagnostics.get('malformed_rows'):
+                with st.expander("🩺 Malformed Row Diagnostics", expanded=False):
+                    st.write(f"**{row_diagnostics['malformed_rows']}** of {row_diagnostics['total_rows']} rows "
+                             f"did not have {row_diagnostics['expected_columns']} columns")
+                    histogram = row_diagnostics['column_count_histogram']
+                    st.dataframe(pd.DataFrame({
+                        'Columns in Row': [int(count) for count in histogram.keys()],
+                        'Rows': list(histogram.values())
+                    }), hide_index=True)
+                    for label, key in [("Padded (short) lines", 'short_line_ranges'),
+                                       ("Truncated (long) lines", 'long_line_ranges')]:
+                        if row_diagnostics[key]:
+                            ranges = ', '.join(str(start) if start == end else f"{start}-{end}"
+                                               for start, end in row_diagnostics[key])
+                            st.caption(f"{label}: {ranges}")
             
             # Dashboard Layout Selection
             st.subheader("📊 Dashboard Layout")
@@ -181,8 +337,8 @@ with st.sidebar:
                         # Chart Type
                         chart_type = st.selectbox(
                             "Chart Type",
-                            options=['line', 'scatter', 'bar', 'area', 'frequency'],
-                            index=['line', 'scatter', 'bar', 'area', 'frequency'].index(config['type']),
+                            options=['line', 'scatter', 'bar', 'area', 'frequency', 'spectrogram', 'cross_correlation'],
+                            index=['line', 'scatter', 'bar', 'area', 'frequency', 'spectrogram', 'cross_correlation'].index(config['type']),
                             key=f"type_{chart_id}"
                         )
                         st.session_state.charts[chart_id]['type'] = chart_type
@@ -190,15 +346,146 @@ with st.sidebar:
                         if chart_type == 'frequency':
                             freq_type = st.selectbox(
                                 "Frequency Analysis Type",
-                                options=['fft', 'psd'],
+                                options=['fft', 'psd', 'lomb'],
                                 index=0,
+                                format_func=lambda kind: {'fft': 'FFT', 'psd': 'PSD (Welch)',
+                                                          'lomb': 'Lomb-Scargle (irregular samples)'}[kind],
                                 key=f"freq_type_{chart_id}"
                             )
                             st.session_state.charts[chart_id]['freq_type'] = freq_type
                         
+                        # Spectral analysis options
+                        # Lomb-Scargle fits the raw samples, so it takes none of these
+                        if chart_type == 'spectrogram' or (chart_type == 'frequency' and freq_type != 'lomb'):
+                            col1, col2, col3 = st.columns(3)
+                            with col1:
+                                st.session_state.charts[chart_id]['window'] = st.selectbox(
+                                    "Window",
+                                    options=SPECTRAL_WINDOWS,
+                                    index=SPECTRAL_WINDOWS.index(config.get('window', 'hann')),
+                                    key=f"window_{chart_id}"
+                                )
+                            with col2:
+                                st.session_state.charts[chart_id]['detrend'] = st.selectbox(
+                                    "Detrend",
+                                    options=DETREND_TYPES,
+                                    index=DETREND_TYPES.index(config.get('detrend', 'constant')),
+                                    key=f"detrend_{chart_id}"
+                                )
+                            with col3:
+                                st.session_state.charts[chart_id]['nan_policy'] = st.selectbox(
+                                    "Missing Values",
+                                    options=NAN_POLICIES,
+                                    index=NAN_POLICIES.index(config.get('nan_policy', 'interpolate')),
+                                    format_func=lambda policy: {'interpolate': 'Interpolate',
+                                                                'mean': 'Fill with mean'}[policy],
+                                    key=f"nan_policy_{chart_id}"
+                                )
+                        
+                        if chart_type == 'spectrogram' or (chart_type == 'frequency' and freq_type == 'psd'):
+                            col1, col2, col3 = st.columns(3)
+                            with col1:
+                                segment_lengths = [64, 128, 256, 512, 1024, 2048, 4096, 8192, 16384]
+                                st.session_state.charts[chart_id]['nperseg'] = st.selectbox(
+                                    "Segment Length",
+                                    options=segment_lengths,
+                                    index=segment_lengths.index(config.get('nperseg', 256)),
+                                    key=f"nperseg_{chart_id}"
+                                )
+                            with col2:
+                                st.session_state.charts[chart_id]['overlap'] = st.slider(
+                                    "Overlap",
+                                    min_value=0.0,
+                                    max_value=0.9,
+                                    value=float(config.get('overlap', 0.5)),
+                                    step=0.05,
+                                    key=f"overlap_{chart_id}"
+                                )
+                            if chart_type == 'frequency':
+                                with col3:
+                                    st.session_state.charts[chart_id]['average'] = st.selectbox(
+                                        "Averaging",
+                                        options=PSD_AVERAGING,
+                                        index=PSD_AVERAGING.index(config.get('average', 'mean')),
+                                        key=f"average_{chart_id}"
+                                    )
+                        
+                        # Dense scatter plots are drawn as a sample-density image
+                        if chart_type == 'scatter':
+                            scatter_modes = ChartManager.SCATTER_MODES
+                            st.session_state.charts[chart_id]['scatter_mode'] = st.selectbox(
+                                "Rendering",
+                                options=scatter_modes,
+                                index=scatter_modes.index(config.get('scatter_mode', 'auto')),
+                                format_func=lambda mode: {'auto': 'Auto (density for large data)',
+                                                          'markers': 'Markers',
+                                                          'density': 'Density'}[mode],
+                                key=f"scatter_mode_{chart_id}"
+                            )
+                        
+                        # Interval aggregates for bar charts
+                        if chart_type == 'bar':
+                            col1, col2 = st.columns(2)
+                            with col1:
+                                st.session_state.charts[chart_id]['bar_aggregation'] = st.selectbox(
+                                    "Aggregation",
+                                    options=BAR_AGGREGATIONS,
+                                    index=BAR_AGGREGATIONS.index(config.get('bar_aggregation', 'mean')),
+                                    format_func=lambda aggregation: {'mean': 'Mean', 'min': 'Minimum',
+                                                                     'max': 'Maximum', 'rms': 'RMS'}[aggregation],
+                                    key=f"bar_aggregation_{chart_id}"
+                                )
+                            with col2:
+                                st.session_state.charts[chart_id]['bar_bins'] = st.number_input(
+                                    "Bars",
+                                    min_value=5,
+                                    max_value=500,
+                                    value=int(config.get('bar_bins', 50)),
+                                    step=5,
+                                    key=f"bar_bins_{chart_id}"
+                                )
+                        
+                        # Point budget for long time histories
+                        if chart_type in ['line', 'area']:
+                            col1, col2 = st.columns(2)
+                            with col1:
+                                decimation = st.selectbox(
+                                    "Decimation",
+                                    options=DECIMATION_METHODS,
+                                    index=DECIMATION_METHODS.index(config.get('decimation', chart_manager.decimation)),
+                                    format_func=lambda method: {'lttb': 'LTTB (shape)',
+                                                                'minmax': 'Min/Max (peaks)',
+                                                                'none': 'None (all points)'}[method],
+                                    key=f"decimation_{chart_id}"
+                                )
+                                st.session_state.charts[chart_id]['decimation'] = decimation
+                            with col2:
+                                max_points = st.number_input(
+                                    "Max points per trace",
+                                    min_value=500,
+                                    max_value=200000,
+                                    value=int(config.get('max_points', chart_manager.max_points_per_trace)),
+                                    step=500,
+                                    disabled=decimation == 'none',
+                                    key=f"max_points_{chart_id}"
+                                )
+                                st.session_state.charts[chart_id]['max_points'] = max_points
+                            
+                            # Zoom window; long windows are drawn from the time-series pyramid
+                            duration = float(df['Elapsed Time (s)'].max()) if 'Elapsed Time (s)' in df.columns else 0.0
+                            if duration > 0:
+                                window = st.slider(
+                                    "Time Window (s)",
+                                    min_value=0.0,
+                                    max_value=duration,
+                                    value=tuple(config.get('x_range') or (0.0, duration)),
+                                    key=f"x_range_{chart_id}"
+                                )
+                                full_view = window[0] <= 0.0 and window[1] >= duration
+                                st.session_state.charts[chart_id]['x_range'] = None if full_view else list(window)
+                        
                         # Parameter Selection
-                        available_params = [col for col in df.columns 
-                                          if col not in ['Timestamp', 'Elapsed Time (s)']]
+                        available_params = parameter_catalog()
                         
                         selected_params = st.multiselect(
                             "Parameters",
@@ -208,13 +495,38 @@ with st.sidebar:
                         )
                         st.session_state.charts[chart_id]['parameters'] = selected_params
                         
+                        # Lag analysis against one of the selected parameters
+                        if chart_type == 'cross_correlation' and selected_params:
+                            col1, col2 = st.columns(2)
+                            with col1:
+                                reference = config.get('reference')
+                                st.session_state.charts[chart_id]['reference'] = st.selectbox(
+                                    "Reference",
+                                    options=selected_params,
+                                    index=selected_params.index(reference) if reference in selected_params else 0,
+                                    key=f"reference_{chart_id}"
+                                )
+                            with col2:
+                                st.session_state.charts[chart_id]['max_lag'] = st.number_input(
+                                    "Max Lag (s)",
+                                    min_value=0.1,
+                                    value=float(config.get('max_lag', 10.0)),
+                                    step=1.0,
+                                    key=f"max_lag_{chart_id}"
+                                )
+                        
                         # Axis Configuration
                         col1, col2 = st.columns(2)
                         with col1:
+                            # Scatter charts can cross-plot against any numeric parameter
+                            x_options = ['Elapsed Time (s)', 'Timestamp']
+                            if chart_type == 'scatter':
+                                x_options += [param for param in available_params
+                                              if param not in df.columns or pd.api.types.is_numeric_dtype(df[param])]
                             x_axis = st.selectbox(
                                 "X-Axis",
-                                options=['Elapsed Time (s)', 'Timestamp'],
-                                index=0 if config['x_axis'] == 'Elapsed Time (s)' else 1,
+                                options=x_options,
+                                index=x_options.index(config['x_axis']) if config['x_axis'] in x_options else 0,
                                 key=f"x_axis_{chart_id}"
                             )
                             st.session_state.charts[chart_id]['x_axis'] = x_axis
@@ -246,7 +558,7 @@ with st.sidebar:
             st.subheader("📤 Export Options")
             if st.button("📊 Export Dashboard as HTML"):
                 html_content = export_manager.export_dashboard_html(
-                    st.session_state.charts, df
+                    st.session_state.charts, df, chart_manager
                 )
                 st.download_button(
                     label="Download HTML Dashboard",
@@ -259,7 +571,8 @@ with st.sidebar:
                 # Generate HTML report with charts and data
                 if st.session_state.data is not None:
                     html_content = export_manager.generate_auto_report(
-                        st.session_state.charts, st.session_state.data
+                        st.session_state.charts, st.session_state.data,
+                        chart_manager=chart_manager
                     )
                     st.download_button(
                         label="Download HTML Report",
@@ -270,6 +583,20 @@ with st.sidebar:
                 else:
                     st.warning("No data available to generate the HTML report. Please upload a data file first.")
 
+            csv_rate = st.number_input(
+                "CSV Resample Rate (Hz)", min_value=0.0, value=0.0, step=1.0,
+                help="Interpolate all parameters onto a uniform time grid; 0 keeps the recorded samples"
+            )
+            if st.button("📄 Export Data as CSV"):
+                csv_content = export_manager.export_data_csv(df, resample_rate=csv_rate or None)
+                if csv_content:
+                    st.download_button(
+                        label="Download CSV Data",
+                        data=csv_content,
+                        file_name=f"flight_data_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
+                        mime="text/csv"
+                    )
+
             if st.button("📈 Export All Charts as Images"):
                 # This would be implemented to export individual chart images
                 st.info("Chart image export functionality coming soon!")
@@ -399,14 +726,30 @@ if st.session_state.data is not None and not st.session_state.data.empty:
                     numeric_cols.remove('Elapsed Time (s)')
                 
                 if len(numeric_cols) > 1:
-                    corr_matrix = df[numeric_cols].corr()
-                    fig_corr = px.imshow(
-                        corr_matrix,
-                        title="Parameter Correlation Matrix",
-                        color_continuous_scale='RdBu_r',
-                        aspect='auto'
+                    col1, col2 = st.columns(2)
+                    with col1:
+                        max_channels = len(numeric_cols)
+                        if len(numeric_cols) > 2:
+                            max_channels = st.slider("Channels in Heatmap", min_value=2,
+                                                     max_value=min(100, len(numeric_cols)),
+                                                     value=min(40, len(numeric_cols)))
+                    with col2:
+                        top_k = st.number_input("Strongest Pairs", min_value=1, max_value=500, value=20)
+                    
+                    # One correlation matrix lookup feeds both the heatmap and the table
+                    correlation = chart_manager.correlation.correlation_matrix(df, numeric_cols)
+                    fig_corr = chart_manager.create_correlation_heatmap(
+                        df, numeric_cols, title="Parameter Correlation Matrix", max_channels=max_channels,
+                        correlation=correlation
                     )
-                    st.plotly_chart(fig_corr, use_container_width=True)
+                    if fig_corr is not None:
+                        st.plotly_chart(fig_corr, use_container_width=True)
+                        st.subheader("Strongest Correlations")
+                        st.dataframe(chart_manager.correlation.top_pairs(df, numeric_cols, int(top_k),
+                                                                         correlation),
+                                     use_container_width=True)
+                    else:
+                        st.info("Need at least 2 non-constant numeric parameters for correlation analysis")
                 else:
                     st.info("Need at least 2 numeric parameters for correlation analysis")
             else:
@@ -423,14 +766,17 @@ if st.session_state.data is not None and not st.session_state.data.empty:
         with analysis_tabs[2]:
             st.subheader("Data Quality Report")
             
+            # One cached profile pass feeds both tables
+            profile = data_profiler.profile(df)['columns']
+            
             # Missing values
-            missing_data = df.isnull().sum()
+            missing_data = profile['nulls']
             if missing_data.sum() > 0:
                 st.warning("Missing Values Detected:")
                 missing_df = pd.DataFrame({
                     'Parameter': missing_data.index,
                     'Missing Count': missing_data.values,
-                    'Missing %': (missing_data.values / len(df) * 100).round(2)
+                    'Missing %': profile['null_pct'].values.round(2)
                 })
                 st.dataframe(missing_df[missing_df['Missing Count'] > 0])
             else:
@@ -438,22 +784,30 @@ if st.session_state.data is not None and not st.session_state.data.empty:
             
             # Data range validation
             st.subheader("Parameter Ranges")
-            numeric_cols = df.select_dtypes(include=[np.number]).columns
-            if len(numeric_cols) > 0:
-                range_data = []
-                for col in numeric_cols:
-                    if col != 'Elapsed Time (s)':
-                        range_data.append({
-                            'Parameter': col,
-                            'Min': df[col].min(),
-                            'Max': df[col].max(),
-                            'Mean': df[col].mean(),
-                            'Std Dev': df[col].std()
-                        })
+            numeric_profile = profile[profile['numeric'] & (profile.index != 'Elapsed Time (s)')]
+            if profile['numeric'].any():
+                range_df = pd.DataFrame({
+                    'Parameter': numeric_profile.index,
+                    'Min': numeric_profile['min'].values,
+                    'Max': numeric_profile['max'].values,
+                    'Mean': numeric_profile['mean'].values,
+                    'Std Dev': numeric_profile['std'].values
+                })
                 
-                if range_data:
-                    range_df = pd.DataFrame(range_data)
+                if not range_df.empty:
                     st.dataframe(range_df)
+            
+            # Sample timing
+            st.subheader("Sampling")
+            sampling = data_processor.analyze_sampling(df)
+            if np.isfinite(sampling['rate']):
+                col1, col2, col3 = st.columns(3)
+                col1.metric("Sample Rate", f"{sampling['rate']:.3g} Hz")
+                col2.metric("Interval Jitter", f"{sampling['jitter'] * 100:.2f}%")
+                col3.metric("Dropouts", sampling['dropouts'])
+                if not sampling['uniform']:
+                    st.warning("Samples are not uniformly spaced; frequency charts are "
+                               f"resampled onto a {sampling['rate']:.3g} Hz grid.")
     
     else:
         st.info("👆 Add charts using the sidebar to start visualizing your flight data!")
@@ -466,7 +820,7 @@ if st.session_state.data is not None and not st.session_state.data.empty:
         with col1:
             if st.button("🎯 Control Surfaces Analysis", use_container_width=True):
                 # Auto-create charts for control surfaces
-                control_params = [col for col in df.columns 
+                control_params = [col for col in parameter_catalog() 
                                 if any(keyword in col.lower() for keyword in 
                                       ['aileron', 'elevator', 'rudder', 'flap'])]
                 
@@ -487,7 +841,7 @@ if st.session_state.data is not None and not st.session_state.data.empty:
         with col2:
             if st.button("📐 Angle Analysis", use_container_width=True):
                 # Auto-create charts for angles
-                angle_params = [col for col in df.columns 
+                angle_params = [col for col in parameter_catalog() 
                               if any(keyword in col.lower() for keyword in 
                                     ['angle', 'alpha', 'beta'])]
                 
@@ -508,7 +862,7 @@ if st.session_state.data is not None and not st.session_state.data.empty:
         with col3:
             if st.button("⚖️ Force Analysis", use_container_width=True):
                 # Auto-create charts for forces
-                force_params = [col for col in df.columns 
+                force_params = [col for col in parameter_catalog() 
                               if any(keyword in col.lower() for keyword in 
                                     ['force', 'strain', 'load'])]
                 
@@ -1,9 +1,13 @@
 # Enhanced Flight Data Analyzer Components Package
 
 from .chart_manager import ChartManager
-from .data_processor import DataProcessor
+from .data_processor import DataProcessor, ColumnStore, ColumnProjection
 from .layout_manager import LayoutManager
 from .export_manager import ExportManager
+from .data_cache import DataCache, LRUCache
+from .data_profiler import DataProfiler
+from .spectral import SpectralEngine
+from .correlation import CorrelationEngine
 
-__all__ = ['ChartManager', 'DataProcessor', 'LayoutManager', 'ExportManager']
+__all__ = ['ChartManager', 'DataProcessor', 'ColumnStore', 'ColumnProjection', 'LayoutManager', 'ExportManager', 'DataCache', 'LRUCache', 'DataProfiler', 'SpectralEngine', 'CorrelationEngine']
 
@@ -1,18 +1,79 @@
 import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
+import copy
+import json
 import pandas as pd
 import numpy as np
 from typing import Dict, List, Any, Optional, Tuple
-from scipy.fft import fft
-from scipy.signal import welch
+
+from components.data_cache import DataCache, LRUCache
+from components.data_processor import DataProcessor
+from components.decimation import (decimate, bin_aggregates, density_grid, DECIMATION_METHODS,
+                                   BAR_AGGREGATIONS)
+from components.correlation import CorrelationEngine
+from components.spectral import SpectralEngine
 
 class ChartManager:
     """
     Manages chart creation and configuration for the enhanced flight analyzer.
+
+    Figures are kept in an LRU cache keyed on the plotted columns of the
+    dataset and the chart configuration, so Streamlit reruns and exports
+    only rebuild charts whose inputs changed.
     """
-    
-    def __init__(self):
+
+    # Largest change float32 may make to a plotted value: half of the last
+    # digit shown by the three-decimal hover labels
+    FLOAT32_TOLERANCE = 5e-4
+
+    # Layout properties shared by every chart type, validated once at import
+    LAYOUT_TEMPLATE = go.Layout(
+        showlegend=True,
+        legend=dict(
+            orientation="h",
+            yanchor="bottom",
+            y=1.02,
+            xanchor="right",
+            x=1
+        ),
+        margin=dict(l=50, r=50, t=80, b=50),
+        height=400
+    ).to_plotly_json()
+
+    _figure_cache = LRUCache(max_entries=64, max_bytes=256 * 1024 ** 2)
+    # Scatter charts with more points than this are drawn as density images
+    # in the default 'auto' scatter mode
+    DENSITY_THRESHOLD = 200_000
+    SCATTER_MODES = ['auto', 'markers', 'density']
+
+    # Bar chart interval aggregates, per dataset, parameter and bar count
+    _bin_cache = LRUCache(max_entries=256)
+
+    def __init__(self, max_points_per_trace: int = 5000, decimation: str = 'lttb',
+                 webgl_threshold: int = 10000, cache_entries: int = 64,
+                 cache_bytes: int = 256 * 1024 ** 2):
+        """
+        Args:
+            max_points_per_trace: Default point budget for line and area traces
+            decimation: Default decimation method ('lttb', 'minmax' or 'none');
+                charts can override both via the 'max_points' and
+                'decimation' config keys
+            webgl_threshold: Charts plotting more points than this (over all
+                traces, after decimation) use WebGL traces; charts can
+                override it via the 'webgl_threshold' config key
+            cache_entries: Number of figures kept in the figure cache
+            cache_bytes: Approximate memory budget for the cached trace data
+        """
+        ChartManager._figure_cache.max_entries = cache_entries
+        ChartManager._figure_cache.max_bytes = cache_bytes
+        self.max_points_per_trace = max_points_per_trace
+        self.webgl_threshold = webgl_threshold
+        self.decimation = decimation if decimation in DECIMATION_METHODS else 'lttb'
+        self.pyramid = None  # Optional TimeSeriesPyramid of the current dataset
+        self.spectral = SpectralEngine()
+        self.processor = DataProcessor()  # Sampling analysis and uniform resampling
+        self.correlation = CorrelationEngine()
         self.color_schemes = {
             'viridis': px.colors.sequential.Viridis,
             'plasma': px.colors.sequential.Plasma,
@@ -28,6 +89,9 @@ class ChartManager:
     def create_chart(self, df: pd.DataFrame, config: Dict[str, Any]) -> Optional[go.Figure]:
         """
         Create a chart based on the provided configuration.
+
+        Cached figures are shared between callers and must not be modified
+        in place.
         
         Args:
             df: DataFrame containing the flight data
@@ -36,6 +100,149 @@ class ChartManager:
         Returns:
             Plotly figure object or None if creation fails
         """
+        key = self._figure_key(df, config)
+        cached = self._figure_cache.get(key)
+        if cached is not None:
+            return cached
+
+        fig = self._build_chart(df, config)
+        if fig is not None:
+            fig = self.compact_figure(fig)
+            self._figure_cache.put(key, fig, self._figure_nbytes(fig))
+        return fig
+
+    def compact_figure(self, fig: go.Figure) -> go.Figure:
+        """
+        Shrink a figure's serialized size without visibly changing it.
+
+        Plotly encodes NumPy arrays as base64 typed arrays, so the payload
+        is dominated by the array types. Values are stored as float32 when
+        that changes none of them by more than FLOAT32_TOLERANCE, datetime
+        x values become epoch milliseconds on a date axis instead of ISO
+        strings, and evenly spaced x values are replaced by ``x0``/``dx``,
+        so traces sampled on the common time axis carry no x array at all.
+        The figure is modified in place and returned.
+
+        Args:
+            fig: Plotly figure
+
+        Returns:
+            The same figure
+        """
+        date_axis = False
+        for trace in fig.data:
+            x = trace['x'] if 'x' in trace else None
+            if isinstance(x, np.ndarray) and x.dtype.kind == 'M':
+                x = x.astype('datetime64[us]')
+                milliseconds = x.view(np.int64) / 1000.0
+                milliseconds[np.isnat(x)] = np.nan
+                trace.x = milliseconds
+                date_axis = True
+                self._compact_x(trace, milliseconds, tolerance=0.5)
+            elif isinstance(x, np.ndarray) and x.dtype.kind in 'iuf':
+                if not self._compact_x(trace, x.astype(np.float64, copy=False),
+                                       tolerance=self.FLOAT32_TOLERANCE):
+                    self._set_array(trace, 'x', self._as_float32(x))
+
+            for name in ('y', 'z'):
+                values = trace[name] if name in trace else None
+                if isinstance(values, np.ndarray) and values.dtype.kind in 'iuf':
+                    self._set_array(trace, name, self._as_float32(values))
+
+        if date_axis:
+            fig.update_xaxes(type='date')
+        return fig
+
+    @staticmethod
+    def _set_array(trace, name: str, values: np.ndarray):
+        """
+        Assign a data array to a trace, keeping the array's dtype.
+        """
+        # Plotly ignores assignments equal to the current value, which would
+        # leave a float64 array in place of its exact float32 copy
+        trace[name] = None
+        trace[name] = values
+
+    @staticmethod
+    def _compact_x(trace, x: np.ndarray, tolerance: float) -> bool:
+        """
+        Replace evenly spaced x values by the trace's ``x0`` and ``dx``.
+
+        Returns:
+            True when the trace was rewritten
+        """
+        n = len(x)
+        if n < 3 or 'dx' not in trace or not np.isfinite(x).all():
+            return False
+        dx = (x[-1] - x[0]) / (n - 1)
+        if dx <= 0:
+            return False
+        deviation = np.abs(x - (x[0] + dx * np.arange(n))).max()
+        if deviation > min(tolerance, 1e-3 * dx):
+            return False
+        trace.x = None
+        trace.x0 = float(x[0])
+        trace.dx = float(dx)
+        return True
+
+    @classmethod
+    def _as_float32(cls, values: np.ndarray) -> np.ndarray:
+        """
+        Downcast to float32 when no value moves by more than FLOAT32_TOLERANCE.
+        """
+        if values.dtype == np.float32:
+            return values
+        narrow = values.astype(np.float32)
+        with np.errstate(invalid='ignore', over='ignore'):
+            error = np.abs(narrow.astype(np.float64) - values)
+        # NaN gaps stay NaN; overflow to inf is a real change
+        if np.nanmax(error, initial=0.0) <= cls.FLOAT32_TOLERANCE and \
+                np.array_equal(np.isnan(narrow), np.isnan(values)):
+            return narrow
+        return values
+
+    def clear_figure_cache(self):
+        """Drop every cached figure."""
+        ChartManager._figure_cache.clear()
+
+    def _figure_key(self, df: pd.DataFrame, config: Dict[str, Any]) -> str:
+        """
+        Identify a figure by the data it plots, its configuration and the
+        manager defaults it falls back to.
+        
+        The data part is the frame key of the plotted columns (see
+        DataCache.frame_key), so a figure is only reused for the same
+        dataset or, for frames without a source key, the same values.
+        """
+        x_axis = config.get('x_axis', 'Elapsed Time (s)')
+        columns = [x_axis, 'Elapsed Time (s)'] + list(config.get('parameters') or [])
+        settings = {
+            'config': {name: value for name, value in config.items() if name != 'id'},
+            'max_points_per_trace': self.max_points_per_trace,
+            'decimation': self.decimation,
+            'webgl_threshold': self.webgl_threshold,
+            'pyramid': self.pyramid is not None and self.pyramid.covers(df)
+        }
+        return DataCache.frame_key(df, columns) + json.dumps(settings, sort_keys=True, default=str)
+
+    @staticmethod
+    def _figure_nbytes(fig: go.Figure) -> int:
+        """
+        Approximate memory held by a figure's trace data arrays.
+        """
+        total = 0
+        for trace in fig.data:
+            for name in ('x', 'y', 'z', 'customdata', 'text'):
+                values = trace[name] if name in trace else None
+                if values is None or isinstance(values, str):
+                    continue
+                total += getattr(values, 'nbytes', None) or 8 * len(values)
+        return total
+
+    def _build_chart(self, df: pd.DataFrame, config: Dict[str, Any]) -> Optional[go.Figure]:
+        """
+        Build the figure for a chart configuration without consulting the cache.
+        """
         try:
             if not config.get('parameters'):
                 return None
@@ -45,9 +252,17 @@ class ChartManager:
             title = config.get('title', 'Flight Data Chart')
             y_axis_label = config.get('y_axis_label', 'Value')
             color_scheme = config.get('color_scheme', 'viridis')
+            decimation = config.get('decimation', self.decimation)
+            max_points = int(config.get('max_points', self.max_points_per_trace))
+            x_range = config.get('x_range')  # Optional (t0, t1) window in elapsed seconds
+            webgl_threshold = int(config.get('webgl_threshold', self.webgl_threshold))
 
             if chart_type == 'frequency':
-                return self.create_frequency_plot(df, config)
+                return self._use_webgl(self.create_frequency_plot(df, config), webgl_threshold)
+            if chart_type == 'spectrogram':
+                return self.create_spectrogram(df, config)
+            if chart_type == 'cross_correlation':
+                return self._use_webgl(self.create_cross_correlation(df, config), webgl_threshold)
             
             # Validate x-axis column exists
             if x_axis not in df.columns:
@@ -60,15 +275,26 @@ class ChartManager:
             
             # Create chart based on type
             if chart_type == 'line':
-                return self._create_line_chart(df, x_axis, valid_params, title, y_axis_label, color_scheme)
+                fig = self._create_line_chart(df, x_axis, valid_params, title, y_axis_label, color_scheme,
+                                              decimation, max_points, x_range)
             elif chart_type == 'scatter':
-                return self._create_scatter_chart(df, x_axis, valid_params, title, y_axis_label, color_scheme)
+                fig = self._create_scatter_chart(df, x_axis, valid_params, title, y_axis_label, color_scheme,
+                                                 config.get('scatter_mode', 'auto'),
+                                                 config.get('density_bins', (500, 300)))
             elif chart_type == 'bar':
-                return self._create_bar_chart(df, x_axis, valid_params, title, y_axis_label, color_scheme)
+                aggregation = config.get('bar_aggregation', 'mean')
+                if aggregation not in BAR_AGGREGATIONS:
+                    aggregation = 'mean'
+                fig = self._create_bar_chart(df, x_axis, valid_params, title, y_axis_label, color_scheme,
+                                             aggregation, int(config.get('bar_bins', 50)))
             elif chart_type == 'area':
-                return self._create_area_chart(df, x_axis, valid_params, title, y_axis_label, color_scheme)
+                fig = self._create_area_chart(df, x_axis, valid_params, title, y_axis_label, color_scheme,
+                                              decimation, max_points, x_range)
             else:
-                return self._create_line_chart(df, x_axis, valid_params, title, y_axis_label, color_scheme)
+                fig = self._create_line_chart(df, x_axis, valid_params, title, y_axis_label, color_scheme,
+                                              decimation, max_points, x_range)
+            
+            return self._use_webgl(fig, webgl_threshold)
                 
         except Exception as e:
             print(f"Error creating chart: {e}")
@@ -92,240 +318,531 @@ class ChartManager:
             title = config.get('title', 'Frequency Analysis')
             y_axis_label = config.get('y_axis_label', 'Magnitude')
             color_scheme = config.get('color_scheme', 'viridis')
-            freq_type = config.get('freq_type', 'fft')  # 'fft' or 'psd'
+            freq_type = config.get('freq_type', 'fft')  # 'fft', 'psd' or 'lomb'
+            # Spectral options: 'window', 'detrend' and 'nan_policy', plus 'nperseg',
+            # 'overlap' and 'average' for the PSD (see SpectralEngine), and
+            # 'resample_rate' (see _uniform_frame). 'lomb' works on the recorded
+            # timestamps and only takes 'max_frequencies'
             
             # Validate parameters
             valid_params = [param for param in config['parameters'] if param in df.columns]
             if not valid_params:
                 return None
             
-            fig = go.Figure()
             colors = self._get_colors(color_scheme, len(valid_params))
             
-            for i, param in enumerate(valid_params):
-                if freq_type == 'fft':
-                    freq, magnitude = self._compute_fft(df[param], df['Elapsed Time (s)'])
-                    y_axis_label = 'Magnitude'
-                else:  # PSD
-                    freq, magnitude = self._compute_psd(df[param], df['Elapsed Time (s)'])
-                    y_axis_label = 'Power/Frequency'
-                
-                fig.add_trace(go.Scatter(
-                    x=freq,
-                    y=magnitude,
-                    mode='lines',
-                    name=param,
-                    line=dict(color=colors[i % len(colors)], width=2),
-                    hovertemplate=f'<b>{param}</b><br>' +
-                                f'Frequency: %{{x:.2f}} Hz<br>' +
-                                f'{y_axis_label}: %{{y:.3e}}<extra></extra>'
-                ))
+            if freq_type != 'lomb':
+                df = self._uniform_frame(df, valid_params, config)
             
-            fig.update_layout(
-                title=dict(text=title, x=0.5, font=dict(size=16)),
-                xaxis_title='Frequency (Hz)',
-                yaxis_title=y_axis_label,
-                xaxis_type='log',
-                yaxis_type='log',
-                hovermode='closest',
-                showlegend=True,
-                legend=dict(
-                    orientation="h",
-                    yanchor="bottom",
-                    y=1.02,
-                    xanchor="right",
-                    x=1
-                ),
-                margin=dict(l=50, r=50, t=80, b=50),
-                height=400
-            )
+            # All parameters are transformed together and cached per parameter
+            options = dict(window=config.get('window', 'hann'),
+                           detrend=config.get('detrend', 'constant'),
+                           nan_policy=config.get('nan_policy', 'interpolate'))
+            if freq_type == 'lomb':
+                freq, spectra = self.spectral.lomb_scargle(
+                    df, valid_params, max_frequencies=int(config.get('max_frequencies', 2048)))
+                y_axis_label = 'Magnitude'
+            elif freq_type == 'fft':
+                freq, spectra = self.spectral.amplitude_spectrum(df, valid_params, **options)
+                y_axis_label = 'Magnitude'
+            else:  # PSD
+                freq, spectra = self.spectral.power_spectral_density(
+                    df, valid_params,
+                    nperseg=int(config.get('nperseg', 256)),
+                    overlap=float(config.get('overlap', 0.5)),
+                    average=config.get('average', 'mean'),
+                    **options
+                )
+                y_axis_label = 'Power/Frequency'
             
-            return fig
+            traces = []
+            for i, param in enumerate(valid_params):
+                magnitude = spectra[param]
+                traces.append({
+                    'type': 'scatter',
+                    'x': self._trace_values(freq),
+                    'y': self._trace_values(magnitude),
+                    'mode': 'lines',
+                    'name': param,
+                    'line': {'color': colors[i % len(colors)], 'width': 2},
+                    'hovertemplate': f'<b>{param}</b><br>' +
+                                     'Frequency: %{x:.2f} Hz<br>' +
+                                     f'{y_axis_label}: %{{y:.3e}}<extra></extra>'
+                })
+            
+            return self._figure(traces, self._base_layout(title, 'Frequency (Hz)', y_axis_label,
+                                                          hovermode='closest', axis_type='log'))
         
         except Exception as e:
             print(f"Error creating frequency plot: {e}")
             return None
 
-    def _compute_fft(self, data: pd.Series, time: pd.Series) -> Tuple[np.ndarray, np.ndarray]:
-        """Compute the FFT of the input data."""
-        n = len(data)
-        dt = (time.iloc[-1] - time.iloc[0]) / (n - 1)  # Time step
+    def create_spectrogram(self, df: pd.DataFrame, config: Dict[str, Any]) -> Optional[go.Figure]:
+        """
+        Create a time-frequency heatmap of the first selected parameter.
         
-        fft_values = fft(data.values)
-        frequencies = np.fft.fftfreq(n, dt)[:n//2]
-        magnitudes = 2.0/n * np.abs(fft_values[0:n//2])
+        The STFT power is reduced to at most 'time_bins' x 'freq_bins'
+        cells (config keys, defaults 1000 x 300), so long recordings render
+        as one compact image trace. 'nperseg', 'overlap', 'window',
+        'detrend' and 'nan_policy' are passed to SpectralEngine.spectrogram
+        and 'resample_rate' to _uniform_frame.
         
-        return frequencies, magnitudes
+        Args:
+            df: DataFrame containing the flight data
+            config: Chart configuration dictionary
+            
+        Returns:
+            Plotly figure object or None if creation fails
+        """
+        try:
+            valid_params = [param for param in config.get('parameters', []) if param in df.columns]
+            if not valid_params or self.spectral.time_column not in df.columns:
+                return None
+            
+            param = valid_params[0]
+            df = self._uniform_frame(df, [param], config)
+            image = self.spectral.spectrogram(
+                df, param,
+                nperseg=int(config.get('nperseg', 256)),
+                overlap=float(config.get('overlap', 0.5)),
+                window=config.get('window', 'hann'),
+                detrend=config.get('detrend', 'constant'),
+                nan_policy=config.get('nan_policy', 'interpolate'),
+                time_bins=int(config.get('time_bins', 1000)),
+                freq_bins=int(config.get('freq_bins', 300))
+            )
+            if not image['power_db'].size:
+                return None
+            
+            colorscale = self.color_schemes.get(config.get('color_scheme', 'viridis'), 'Viridis')
+            trace = {
+                'type': 'heatmap',
+                'x': image['time'],
+                'y': image['frequency'],
+                'z': image['power_db'],
+                'colorscale': colorscale,
+                'colorbar': {'title': {'text': 'dB'}},
+                'hovertemplate': f'<b>{param}</b><br>' +
+                                 'Time: %{x:.2f} s<br>' +
+                                 'Frequency: %{y:.2f} Hz<br>' +
+                                 'PSD: %{z:.1f} dB<extra></extra>'
+            }
+            
+            title = config.get('title', f'Spectrogram - {param}')
+            layout = self._base_layout(title, self.spectral.time_column, 'Frequency (Hz)',
+                                       hovermode='closest')
+            return self._figure([trace], layout)
+        
+        except Exception as e:
+            print(f"Error creating spectrogram: {e}")
+            return None
 
-    def _compute_psd(self, data: pd.Series, time: pd.Series) -> Tuple[np.ndarray, np.ndarray]:
-        """Compute the Power Spectral Density using Welch's method."""
-        dt = (time.iloc[-1] - time.iloc[0]) / (len(time) - 1)  # Time step
-        frequencies, psd = welch(data.values, fs=1/dt)
+    def create_cross_correlation(self, df: pd.DataFrame, config: Dict[str, Any]) -> Optional[go.Figure]:
+        """
+        Plot the lag curves of the selected parameters against a reference parameter.
+        
+        The reference is the 'reference' config key, or the first selected
+        parameter. Lags up to 'max_lag' seconds (default 10) are shown, and
+        every legend entry reports the lag and coefficient of the strongest
+        correlation, which is also marked on the curve. 'detrend',
+        'nan_policy' and 'resample_rate' are applied as for frequency charts.
         
-        return frequencies, psd
+        Args:
+            df: DataFrame containing the flight data
+            config: Chart configuration dictionary
+            
+        Returns:
+            Plotly figure object or None if creation fails
+        """
+        try:
+            valid_params = [param for param in config.get('parameters', [])
+                            if param in df.columns and pd.api.types.is_numeric_dtype(df[param])]
+            reference = config.get('reference')
+            if reference not in valid_params:
+                reference = valid_params[0] if valid_params else None
+            others = [param for param in valid_params if param != reference]
+            if not others or self.spectral.time_column not in df.columns:
+                return None
+            
+            df = self._uniform_frame(df, valid_params, config)
+            lags, pairs = self.spectral.cross_correlation(
+                df, reference, others,
+                max_lag=float(config.get('max_lag', 10.0)),
+                detrend=config.get('detrend', 'constant'),
+                nan_policy=config.get('nan_policy', 'interpolate')
+            )
+            
+            colors = self._get_colors(config.get('color_scheme', 'viridis'), len(others))
+            traces = []
+            for i, param in enumerate(others):
+                pair = pairs[param]
+                traces.append({
+                    'type': 'scatter',
+                    'x': lags,
+                    'y': self._trace_values(pair['curve']),
+                    'mode': 'lines',
+                    'name': f"{param} (lag {pair['lag']:+.3f} s, r={pair['coefficient']:.2f})",
+                    'line': {'color': colors[i % len(colors)], 'width': 2},
+                    'hovertemplate': f'<b>{param}</b><br>' +
+                                     'Lag: %{x:.3f} s<br>' +
+                                     'Correlation: %{y:.3f}<extra></extra>'
+                })
+            
+            peaks = [param for param in others if np.isfinite(pairs[param]['lag'])]
+            if peaks:
+                traces.append({
+                    'type': 'scatter',
+                    'x': [pairs[param]['lag'] for param in peaks],
+                    'y': [pairs[param]['coefficient'] for param in peaks],
+                    'mode': 'markers',
+                    'name': 'Peak',
+                    'marker': {'color': [colors[others.index(param) % len(colors)] for param in peaks],
+                               'size': 10, 'symbol': 'x'},
+                    'customdata': peaks,
+                    'hovertemplate': '<b>%{customdata}</b><br>' +
+                                     'Peak lag: %{x:.3f} s<br>' +
+                                     'Correlation: %{y:.3f}<extra></extra>'
+                })
+            
+            title = config.get('title', f'Cross-Correlation - {reference}')
+            layout = self._base_layout(title, f'Lag behind {reference} (s)', 'Correlation',
+                                       hovermode='closest')
+            return self._figure(traces, layout)
+        
+        except Exception as e:
+            print(f"Error creating cross-correlation chart: {e}")
+            return None
     
-    def _create_line_chart(self, df: pd.DataFrame, x_axis: str, parameters: List[str], 
-                          title: str, y_axis_label: str, color_scheme: str) -> go.Figure:
-        """Create a line chart."""
-        fig = go.Figure()
+    def _uniform_frame(self, df: pd.DataFrame, parameters: List[str],
+                       config: Dict[str, Any]) -> pd.DataFrame:
+        """
+        Return spectral-analysis input sampled on a uniform time grid.
         
-        colors = self._get_colors(color_scheme, len(parameters))
+        The 'resample_rate' config key selects the grid rate in Hz; 0 uses
+        the samples as recorded. Without it, recordings with jitter or
+        dropouts are resampled at their median rate and uniform ones are
+        used as is.
+        """
+        rate = config.get('resample_rate')
+        if rate is None:
+            sampling = self.processor.analyze_sampling(df)
+            if sampling['uniform'] or not np.isfinite(sampling['rate']):
+                return df
+            rate = sampling['rate']
+        elif float(rate) <= 0:
+            return df
+        return self.processor.resample_uniform(df, parameters, float(rate))
+    
+    def _use_webgl(self, fig: Optional[go.Figure], threshold: int) -> Optional[go.Figure]:
+        """
+        Switch a figure's Scatter traces to WebGL once it plots too many points.
         
-        for i, param in enumerate(parameters):
-            fig.add_trace(go.Scatter(
-                x=df[x_axis],
-                y=df[param],
-                mode='lines',
-                name=param,
-                line=dict(color=colors[i % len(colors)], width=2),
-                hovertemplate=f'<b>{param}</b><br>' +
-                             f'{x_axis}: %{{x}}<br>' +
-                             f'Value: %{{y:.3f}}<extra></extra>'
-            ))
+        Trace properties (hover templates, colors, fills) are carried over
+        unchanged and the layout, including hovermode, is reused as is.
+        """
+        if fig is None:
+            return None
         
-        fig.update_layout(
-            title=dict(text=title, x=0.5, font=dict(size=16)),
-            xaxis_title=x_axis,
-            yaxis_title=y_axis_label,
-            hovermode='x unified',
-            showlegend=True,
-            legend=dict(
-                orientation="h",
-                yanchor="bottom",
-                y=1.02,
-                xanchor="right",
-                x=1
-            ),
-            margin=dict(l=50, r=50, t=80, b=50),
-            height=400
-        )
+        points = sum(len(trace.x) for trace in fig.data
+                     if trace.type == 'scatter' and trace.x is not None)
+        if points <= threshold:
+            return fig
         
-        return fig
+        traces = []
+        for trace in fig.data:
+            properties = trace.to_plotly_json()
+            if trace.type == 'scatter':
+                properties['type'] = 'scattergl'
+            traces.append(properties)
+        return self._figure(traces, fig.layout.to_plotly_json())
     
-    def _create_scatter_chart(self, df: pd.DataFrame, x_axis: str, parameters: List[str], 
-                             title: str, y_axis_label: str, color_scheme: str) -> go.Figure:
-        """Create a scatter chart."""
-        fig = go.Figure()
+    def set_pyramid(self, pyramid):
+        """
+        Attach the TimeSeriesPyramid of the dataset being charted.
         
+        Windowed line and area charts on its time axis then read min/max
+        envelopes from the pyramid instead of scanning the raw samples.
+        """
+        self.pyramid = pyramid
+    
+    def get_pyramid_level(self, param: str, t0: Optional[float], t1: Optional[float],
+                          pixel_width: int) -> Optional[Dict[str, Any]]:
+        """
+        Get the pyramid level that resolves a time window at a pixel width.
+        
+        Args:
+            param: Parameter name
+            t0, t1: Window bounds in elapsed seconds (None for the data bounds)
+            pixel_width: Horizontal resolution of the plot
+            
+        Returns:
+            Level dictionary (see TimeSeriesPyramid.get_level), or None when
+            no pyramid covers the parameter
+        """
+        if self.pyramid is None or param not in self.pyramid:
+            return None
+        return self.pyramid.get_level(param, t0, t1, pixel_width)
+    
+    def _decimated_xy(self, df: pd.DataFrame, x_axis: str, param: str,
+                      decimation: str, max_points: int,
+                      x_range: Optional[Tuple[float, float]] = None) -> Tuple[Any, Any]:
+        """
+        Return the x and y values of one trace, decimated to the point budget.
+        
+        With ``x_range`` only the samples inside that elapsed-time window are
+        used; on the pyramid's axis, windows too long to draw at full rate are
+        drawn as the min/max envelope of the matching pyramid level.
+        Non-numeric parameters and traces within budget are passed through.
+        """
+        x, y = df[x_axis], df[param]
+        numeric = pd.api.types.is_numeric_dtype(y)
+        
+        if x_range is not None and 'Elapsed Time (s)' in df.columns:
+            if (numeric and decimation != 'none' and self.pyramid is not None and
+                    x_axis == self.pyramid.x_axis and self.pyramid.covers(df)):
+                # A level holds up to twice the requested buckets, two points each
+                level = self.get_pyramid_level(param, x_range[0], x_range[1], max(1, max_points // 4))
+                if level is not None and level['level'] >= 0:
+                    # Each bucket becomes a vertical min-max segment, so spikes stay visible
+                    return (np.repeat(level['x'], 2),
+                            np.column_stack([level['min'], level['max']]).ravel())
+            
+            elapsed = df['Elapsed Time (s)'].to_numpy()
+            lo = np.searchsorted(elapsed, x_range[0], side='left')
+            hi = np.searchsorted(elapsed, x_range[1], side='right')
+            x, y = x.iloc[lo:hi], y.iloc[lo:hi]
+        
+        if decimation == 'none' or len(x) <= max_points or not numeric:
+            return x, y
+        
+        x_values = x.to_numpy()
+        y_values = y.to_numpy(dtype=np.float64, na_value=np.nan)
+        idx = decimate(x_values, y_values, max_points, decimation)
+        return x_values[idx], y_values[idx]
+    
+    def _create_line_chart(self, df: pd.DataFrame, x_axis: str, parameters: List[str], 
+                          title: str, y_axis_label: str, color_scheme: str,
+                          decimation: str = 'none', max_points: int = 5000,
+                          x_range: Optional[Tuple[float, float]] = None) -> go.Figure:
+        """Create a line chart, decimating each trace to ``max_points``."""
         colors = self._get_colors(color_scheme, len(parameters))
         
+        traces = []
         for i, param in enumerate(parameters):
-            fig.add_trace(go.Scatter(
-                x=df[x_axis],
-                y=df[param],
-                mode='markers',
-                name=param,
-                marker=dict(
-                    color=colors[i % len(colors)],
-                    size=4,
-                    opacity=0.7
-                ),
-                hovertemplate=f'<b>{param}</b><br>' +
-                             f'{x_axis}: %{{x}}<br>' +
-                             f'Value: %{{y:.3f}}<extra></extra>'
-            ))
+            x, y = self._decimated_xy(df, x_axis, param, decimation, max_points, x_range)
+            traces.append({
+                'type': 'scatter',
+                'x': self._trace_values(x),
+                'y': self._trace_values(y),
+                'mode': 'lines',
+                'name': param,
+                'line': {'color': colors[i % len(colors)], 'width': 2},
+                'hovertemplate': self._hover_template(param, x_axis)
+            })
+        
+        return self._figure(traces, self._base_layout(title, x_axis, y_axis_label))
+    
+    def _create_scatter_chart(self, df: pd.DataFrame, x_axis: str, parameters: List[str], 
+                             title: str, y_axis_label: str, color_scheme: str,
+                             mode: str = 'auto', density_bins: Tuple[int, int] = (500, 300)) -> go.Figure:
+        """
+        Create a scatter chart, or a density image of it.
         
-        fig.update_layout(
-            title=dict(text=title, x=0.5, font=dict(size=16)),
-            xaxis_title=x_axis,
-            yaxis_title=y_axis_label,
-            hovermode='closest',
-            showlegend=True,
-            legend=dict(
-                orientation="h",
-                yanchor="bottom",
-                y=1.02,
-                xanchor="right",
-                x=1
-            ),
-            margin=dict(l=50, r=50, t=80, b=50),
-            height=400
-        )
+        With ``mode`` 'density' (or 'auto' once the numeric parameters hold
+        more than DENSITY_THRESHOLD points) their (x, y) pairs are pooled and
+        counted in a ``density_bins`` (x, y) grid, which is drawn as one
+        heatmap trace on a log color scale instead of a marker per sample.
+        """
+        numeric = [param for param in parameters if pd.api.types.is_numeric_dtype(df[param])]
+        x_numeric = pd.api.types.is_numeric_dtype(df[x_axis]) or pd.api.types.is_datetime64_any_dtype(df[x_axis])
+        if mode == 'auto':
+            mode = 'density' if len(df) * len(numeric) > self.DENSITY_THRESHOLD else 'markers'
+        if mode == 'density' and numeric and x_numeric:
+            return self._create_density_chart(df, x_axis, numeric, title, y_axis_label, color_scheme,
+                                              density_bins)
         
-        return fig
+        colors = self._get_colors(color_scheme, len(parameters))
+        x = self._trace_values(df[x_axis])
+        
+        traces = []
+        for i, param in enumerate(parameters):
+            traces.append({
+                'type': 'scatter',
+                'x': x,
+                'y': self._trace_values(df[param]),
+                'mode': 'markers',
+                'name': param,
+                'marker': {'color': colors[i % len(colors)], 'size': 4, 'opacity': 0.7},
+                'hovertemplate': self._hover_template(param, x_axis)
+            })
+        
+        return self._figure(traces, self._base_layout(title, x_axis, y_axis_label, hovermode='closest'))
+    
+    def _create_density_chart(self, df: pd.DataFrame, x_axis: str, parameters: List[str],
+                              title: str, y_axis_label: str, color_scheme: str,
+                              density_bins: Tuple[int, int]) -> go.Figure:
+        """Draw the sample density of (x, parameter) pairs as a single heatmap trace."""
+        x = self._trace_values(df[x_axis])
+        if len(parameters) > 1:
+            x = np.tile(x, len(parameters))
+        y = np.concatenate([df[param].to_numpy(dtype=np.float64, na_value=np.nan) for param in parameters])
+        grid = density_grid(x, y, int(density_bins[0]), int(density_bins[1]))
+        
+        # Log scale, so sparse excursions stay visible next to dense cruise data
+        with np.errstate(divide='ignore'):
+            density = np.where(grid['counts'] > 0, np.log10(grid['counts']), np.nan).astype(np.float32)
+        peak = int(np.ceil(np.nanmax(density, initial=0.0)))
+        name = parameters[0] if len(parameters) == 1 else ', '.join(parameters)
+        trace = {
+            'type': 'heatmap',
+            'x': grid['x'],
+            'y': grid['y'],
+            'z': density,
+            'name': name,
+            'colorscale': self.color_schemes.get(color_scheme, 'Viridis'),
+            'colorbar': {'title': {'text': 'Samples'}, 'tickvals': list(range(peak + 1)),
+                         'ticktext': [f'{10 ** decade:,}' for decade in range(peak + 1)]},
+            'hovertemplate': f'<b>{name}</b><br>' +
+                             f'{x_axis}: %{{x}}<br>' +
+                             'Value: %{y:.3f}<br>' +
+                             'Samples: 10^%{z:.2f}<extra></extra>'
+        }
+        return self._figure([trace], self._base_layout(title, x_axis, y_axis_label, hovermode='closest'))
     
     def _create_bar_chart(self, df: pd.DataFrame, x_axis: str, parameters: List[str], 
-                         title: str, y_axis_label: str, color_scheme: str) -> go.Figure:
-        """Create a bar chart (useful for discrete time intervals)."""
-        fig = go.Figure()
-        
+                         title: str, y_axis_label: str, color_scheme: str,
+                         aggregation: str = 'mean', bins: int = 50) -> go.Figure:
+        """
+        Create a bar chart of ``bins`` consecutive intervals, each bar showing
+        one of BAR_AGGREGATIONS over every sample of its interval.
+        """
+        parameters = [param for param in parameters if pd.api.types.is_numeric_dtype(df[param])]
         colors = self._get_colors(color_scheme, len(parameters))
         
-        # Sample data for bar chart (take every nth point to avoid overcrowding)
-        sample_interval = max(1, len(df) // 50)  # Show max 50 bars
-        sampled_df = df.iloc[::sample_interval]
-        
+        traces = []
         for i, param in enumerate(parameters):
-            fig.add_trace(go.Bar(
-                x=sampled_df[x_axis],
-                y=sampled_df[param],
-                name=param,
-                marker_color=colors[i % len(colors)],
-                opacity=0.8,
-                hovertemplate=f'<b>{param}</b><br>' +
-                             f'{x_axis}: %{{x}}<br>' +
-                             f'Value: %{{y:.3f}}<extra></extra>'
-            ))
+            binned = self.bar_bins(df, x_axis, param, bins)
+            traces.append({
+                'type': 'bar',
+                'x': binned['x'],
+                'y': binned[aggregation],
+                'name': param,
+                'marker': {'color': colors[i % len(colors)]},
+                'opacity': 0.8,
+                'hovertemplate': self._hover_template(f'{param} ({aggregation})', x_axis)
+            })
+        
+        return self._figure(traces, self._base_layout(title, x_axis, y_axis_label, barmode='group'))
+    
+    def bar_bins(self, df: pd.DataFrame, x_axis: str, param: str, bins: int = 50) -> Dict[str, np.ndarray]:
+        """
+        All BAR_AGGREGATIONS of one parameter over ``bins`` consecutive intervals.
         
-        fig.update_layout(
-            title=dict(text=title, x=0.5, font=dict(size=16)),
-            xaxis_title=x_axis,
-            yaxis_title=y_axis_label,
-            hovermode='x unified',
-            showlegend=True,
-            legend=dict(
-                orientation="h",
-                yanchor="bottom",
-                y=1.02,
-                xanchor="right",
-                x=1
-            ),
-            margin=dict(l=50, r=50, t=80, b=50),
-            height=400,
-            barmode='group'
-        )
+        Every aggregate is computed in one pass and cached per dataset, so
+        switching a bar chart between mean, min, max and RMS costs nothing.
+        The cache is keyed on the frame key of ``x_axis`` and ``param``, so
+        interval peaks always come from the dataset passed in.
         
-        return fig
+        Args:
+            df: DataFrame containing the flight data
+            x_axis: Column providing the bar positions (the middle sample of
+                each interval)
+            param: Numeric parameter
+            bins: Maximum number of intervals
+            
+        Returns:
+            Dictionary with 'x' and one array per aggregation
+        """
+        key = (DataCache.frame_key(df, [x_axis, param]), x_axis, param, int(bins))
+        cached = self._bin_cache.get(key)
+        if cached is not None:
+            return cached
+        
+        y = df[param].to_numpy(dtype=np.float64, na_value=np.nan)
+        binned = bin_aggregates(y, bins)
+        middle = np.minimum(binned.pop('start') + binned.pop('size') // 2, len(y) - 1)
+        binned['x'] = self._trace_values(df[x_axis])[middle]
+        
+        self._bin_cache.put(key, binned)
+        return binned
     
     def _create_area_chart(self, df: pd.DataFrame, x_axis: str, parameters: List[str], 
-                          title: str, y_axis_label: str, color_scheme: str) -> go.Figure:
-        """Create an area chart."""
-        fig = go.Figure()
-        
+                          title: str, y_axis_label: str, color_scheme: str,
+                          decimation: str = 'none', max_points: int = 5000,
+                          x_range: Optional[Tuple[float, float]] = None) -> go.Figure:
+        """Create an area chart, decimating each trace to ``max_points``."""
         colors = self._get_colors(color_scheme, len(parameters))
         
+        traces = []
         for i, param in enumerate(parameters):
-            fig.add_trace(go.Scatter(
-                x=df[x_axis],
-                y=df[param],
-                mode='lines',
-                name=param,
-                fill='tonexty' if i > 0 else 'tozeroy',
-                line=dict(color=colors[i % len(colors)], width=1),
-                fillcolor=colors[i % len(colors)].replace('rgb', 'rgba').replace(')', ',0.3)'),
-                hovertemplate=f'<b>{param}</b><br>' +
-                             f'{x_axis}: %{{x}}<br>' +
-                             f'Value: %{{y:.3f}}<extra></extra>'
-            ))
+            x, y = self._decimated_xy(df, x_axis, param, decimation, max_points, x_range)
+            color = colors[i % len(colors)]
+            traces.append({
+                'type': 'scatter',
+                'x': self._trace_values(x),
+                'y': self._trace_values(y),
+                'mode': 'lines',
+                'name': param,
+                'fill': 'tonexty' if i > 0 else 'tozeroy',
+                'line': {'color': color, 'width': 1},
+                'fillcolor': color.replace('rgb', 'rgba').replace(')', ',0.3)'),
+                'hovertemplate': self._hover_template(param, x_axis)
+            })
+        
+        return self._figure(traces, self._base_layout(title, x_axis, y_axis_label))
+    
+    def _base_layout(self, title: str, x_title: str, y_title: str, hovermode: str = 'x unified',
+                     axis_type: Optional[str] = None, **extra) -> Dict[str, Any]:
+        """
+        Build a chart layout from the shared, pre-validated template.
         
-        fig.update_layout(
-            title=dict(text=title, x=0.5, font=dict(size=16)),
-            xaxis_title=x_axis,
-            yaxis_title=y_axis_label,
-            hovermode='x unified',
-            showlegend=True,
-            legend=dict(
-                orientation="h",
-                yanchor="bottom",
-                y=1.02,
-                xanchor="right",
-                x=1
-            ),
-            margin=dict(l=50, r=50, t=80, b=50),
-            height=400
-        )
+        Args:
+            title: Chart title
+            x_title, y_title: Axis titles
+            hovermode: Plotly hovermode
+            axis_type: Optional type for both axes (e.g. 'log')
+            **extra: Further top-level layout properties (e.g. barmode)
+        """
+        layout = copy.deepcopy(self.LAYOUT_TEMPLATE)
+        layout['title'] = {'text': title, 'x': 0.5, 'font': {'size': 16}}
+        layout['xaxis'] = {'title': {'text': x_title}}
+        layout['yaxis'] = {'title': {'text': y_title}}
+        if axis_type:
+            layout['xaxis']['type'] = layout['yaxis']['type'] = axis_type
+        layout['hovermode'] = hovermode
+        layout.update(extra)
+        return layout
+    
+    @staticmethod
+    def _figure(traces: List[Dict[str, Any]], layout: Dict[str, Any]) -> go.Figure:
+        """
+        Wrap trace and layout dicts in a Figure without Plotly's property validation.
         
-        return fig
+        Traces are built from fixed, known-good properties here, and the
+        per-property validation of go.Scatter and update_layout is a large
+        share of chart build time for dashboards with many traces.
+        """
+        return go.Figure({'data': traces, 'layout': layout}, _validate=False)
+    
+    @staticmethod
+    def _trace_values(values) -> np.ndarray:
+        """
+        Plain NumPy array for an unvalidated trace (validation would do this conversion).
+        """
+        if isinstance(values, (pd.Series, pd.Index)):
+            # Nullable and Arrow-backed numeric columns become float64 with NaN gaps
+            if (not isinstance(values.dtype, np.dtype) and pd.api.types.is_numeric_dtype(values)
+                    and not pd.api.types.is_bool_dtype(values)):
+                return values.to_numpy(dtype=np.float64, na_value=np.nan)
+            return values.to_numpy()
+        return np.asarray(values)
+    
+    @staticmethod
+    def _hover_template(param: str, x_axis: str) -> str:
+        """Hover label shared by the time-history chart types."""
+        return (f'<b>{param}</b><br>' +
+                f'{x_axis}: %{{x}}<br>' +
+                'Value: %{y:.3f}<extra></extra>')
     
     def _get_colors(self, color_scheme: str, num_colors: int) -> List[str]:
         """Get a list of colors from the specified color scheme."""
@@ -393,9 +910,20 @@ class ChartManager:
         return fig
     
     def create_correlation_heatmap(self, df: pd.DataFrame, parameters: List[str], 
-                                  title: str = "Parameter Correlation") -> go.Figure:
+                                  title: str = "Parameter Correlation",
+                                  resample_rate: Optional[float] = None,
+                                  max_channels: int = 40,
+                                  correlation: Optional[Dict[str, Any]] = None) -> go.Figure:
         """
         Create a correlation heatmap for selected parameters.
+        
+        With ``resample_rate`` (Hz) the parameters are first interpolated onto
+        a common uniform grid, so channels recorded at different bus rates
+        are compared sample for sample. Wide selections are reduced to the
+        ``max_channels`` most correlated channels, and the rows are ordered
+        by clustering so correlated groups form blocks. Without resampling,
+        a ``correlation`` result the caller already computed for these
+        parameters (CorrelationEngine.correlation_matrix) is reused.
         """
         # Filter numeric columns and selected parameters
         valid_params = [param for param in parameters if param in df.columns and pd.api.types.is_numeric_dtype(df[param])]
@@ -403,26 +931,35 @@ class ChartManager:
         if len(valid_params) < 2:
             return None
         
+        if resample_rate:
+            df = self.processor.resample_uniform(df, valid_params, resample_rate)
+            correlation = None
+        
         # Calculate correlation matrix
-        corr_matrix = df[valid_params].corr()
+        names, matrix = self.correlation.clustered(df, valid_params, max_channels, correlation)
+        if len(names) < 2:
+            return None
+        
+        # Cell labels only while they stay legible
+        labels = {}
+        if len(names) <= 20:
+            labels = dict(text=np.round(matrix, 2), texttemplate="%{text}", textfont={"size": 10})
         
         fig = go.Figure(data=go.Heatmap(
-            z=corr_matrix.values,
-            x=corr_matrix.columns,
-            y=corr_matrix.columns,
+            z=matrix,
+            x=names,
+            y=names,
             colorscale='RdBu_r',
             zmid=0,
-            text=np.round(corr_matrix.values, 2),
-            texttemplate="%{text}",
-            textfont={"size": 10},
-            hovertemplate='<b>%{x}</b> vs <b>%{y}</b><br>Correlation: %{z:.3f}<extra></extra>'
+            hovertemplate='<b>%{x}</b> vs <b>%{y}</b><br>Correlation: %{z:.3f}<extra></extra>',
+            **labels
         ))
         
         fig.update_layout(
             title=dict(text=title, x=0.5, font=dict(size=16)),
             xaxis_title="Parameters",
             yaxis_title="Parameters",
-            height=500,
+            height=max(500, 16 * len(names)),
             margin=dict(l=50, r=50, t=80, b=50)
         )
         
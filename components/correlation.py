@@ -0,0 +1,182 @@
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Any, Optional, Tuple
+from scipy.cluster.hierarchy import linkage, leaves_list
+from scipy.spatial.distance import squareform
+
+from components.data_cache import DataCache, LRUCache
+
+
+class CorrelationEngine:
+    """
+    Pearson correlation of many flight channels at once.
+
+    Channels are standardized into one float32 (channels x samples) matrix,
+    column block by column block, and the correlation matrix is its Gram
+    matrix divided by the number of samples, computed in column blocks as
+    well. Constant and empty channels are skipped. Matrices are cached per
+    dataset and channel list, so top-pair tables and heatmaps of the same
+    selection share one computation.
+    """
+
+    _cache = LRUCache(max_entries=8)
+
+    def __init__(self, max_entries: int = 8, block_columns: int = 256, max_rows: int = 200_000):
+        """
+        Args:
+            max_entries: Number of correlation matrices kept in the cache
+            block_columns: Channels standardized and multiplied per block,
+                which bounds the size of the intermediate arrays
+            max_rows: Longer recordings are correlated over this many evenly
+                spaced rows, which changes coefficients by about 1/sqrt(max_rows)
+        """
+        CorrelationEngine._cache.max_entries = max_entries
+        self.block_columns = block_columns
+        self.max_rows = max_rows
+
+    def correlation_matrix(self, df: pd.DataFrame, parameters: List[str]) -> Dict[str, Any]:
+        """
+        Correlation matrix of the numeric, non-constant channels among ``parameters``.
+
+        Missing samples are left out pairwise: each coefficient is averaged
+        over the rows where both channels are present, with every channel
+        standardized over all of its own valid samples.
+
+        Args:
+            df: Flight DataFrame
+            parameters: Channels to correlate
+
+        Returns:
+            Dictionary with 'parameters' (the correlated channels), 'matrix'
+            (float32 channels x channels) and 'skipped' (constant, empty or
+            non-numeric channels)
+        """
+        key = (DataCache.frame_key(df, parameters), tuple(parameters), self.max_rows)
+        cached = self._cache.get(key)
+        if cached is not None:
+            return cached
+
+        numeric = [param for param in parameters
+                   if param in df.columns and pd.api.types.is_numeric_dtype(df[param])]
+        rows = slice(None)
+        if len(df) > self.max_rows:
+            rows = np.linspace(0, len(df) - 1, self.max_rows).astype(np.int64)
+
+        # Standardize in column blocks straight into a float32 (channels x
+        # samples) matrix, one contiguous row per channel
+        standardized = np.empty((len(numeric), min(len(df), self.max_rows)), dtype=np.float32)
+        present = None
+        keep = np.zeros(len(numeric), dtype=bool)
+        for start in range(0, len(numeric), self.block_columns):
+            stop = start + len(numeric[start:start + self.block_columns])
+            block = np.stack([df[name].to_numpy(dtype=np.float64, na_value=np.nan)[rows]
+                              for name in numeric[start:stop]])
+            valid = np.isfinite(block)
+            if not valid.all():
+                if present is None:
+                    present = np.ones(standardized.shape, dtype=np.float32)
+                present[start:stop] = valid
+                block[~valid] = 0.0
+            count = valid.sum(axis=1)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                mean = block.sum(axis=1) / count
+                block -= mean[:, None]
+                if present is not None:
+                    block[~valid] = 0.0
+                std = np.sqrt(np.square(block).sum(axis=1) / count)
+                # Relative threshold, so channels that only hold rounding noise count as constant
+                keep[start:stop] = (count > 1) & (std > 1e-12 * np.abs(mean))
+                np.divide(block, std[:, None], out=standardized[start:stop], casting='same_kind')
+
+        if not keep.all():
+            standardized = standardized[keep]
+            present = present[keep] if present is not None else None
+        names = [name for name, kept in zip(numeric, keep) if kept]
+
+        # Upper block triangle only; the lower one is its mirror
+        matrix = np.empty((len(names), len(names)), dtype=np.float32)
+        for start in range(0, len(names), self.block_columns):
+            stop = min(len(names), start + self.block_columns)
+            products = standardized[start:stop] @ standardized[start:].T
+            if present is not None:
+                pairs = present[start:stop] @ present[start:].T
+                with np.errstate(invalid='ignore', divide='ignore'):
+                    products = np.where(pairs > 0, products / pairs, np.nan)
+            else:
+                products /= standardized.shape[1]
+            matrix[start:stop, start:] = products
+            matrix[start:, start:stop] = products.T
+        np.clip(matrix, -1.0, 1.0, out=matrix)
+        np.fill_diagonal(matrix, 1.0)
+
+        result = {
+            'parameters': names,
+            'matrix': matrix,
+            'skipped': [param for param in parameters if param not in set(names)]
+        }
+        self._cache.put(key, result)
+        return result
+
+    def top_pairs(self, df: pd.DataFrame, parameters: List[str], k: int = 20,
+                  correlation: Optional[Dict[str, Any]] = None) -> pd.DataFrame:
+        """
+        The ``k`` channel pairs with the strongest correlation, positive or negative.
+
+        Args:
+            df: Flight DataFrame
+            parameters: Channels to correlate
+            k: Number of pairs
+            correlation: correlation_matrix result for ``df`` and
+                ``parameters``, when the caller already has it
+
+        Returns:
+            DataFrame with 'Parameter A', 'Parameter B' and 'Correlation',
+            strongest first
+        """
+        result = correlation or self.correlation_matrix(df, parameters)
+        names, matrix = result['parameters'], result['matrix']
+        upper_rows, upper_cols = np.triu_indices(len(names), k=1)
+        strength = np.nan_to_num(np.abs(matrix[upper_rows, upper_cols]), nan=-1.0)
+        k = min(k, len(strength))
+        if k <= 0:
+            return pd.DataFrame(columns=['Parameter A', 'Parameter B', 'Correlation'])
+
+        top = np.argpartition(strength, len(strength) - k)[-k:]
+        top = top[np.argsort(strength[top])[::-1]]
+        return pd.DataFrame({
+            'Parameter A': [names[i] for i in upper_rows[top]],
+            'Parameter B': [names[j] for j in upper_cols[top]],
+            'Correlation': matrix[upper_rows[top], upper_cols[top]].astype(np.float64)
+        })
+
+    def clustered(self, df: pd.DataFrame, parameters: List[str], max_channels: int = 40,
+                  correlation: Optional[Dict[str, Any]] = None) -> Tuple[List[str], np.ndarray]:
+        """
+        Reduced correlation matrix ordered so that correlated channels sit together.
+
+        Keeps the ``max_channels`` channels with the strongest correlation
+        to any other channel and orders them by average-linkage clustering
+        on 1 - |r|. ``correlation`` is an already computed correlation_matrix
+        result for ``df`` and ``parameters``, as in top_pairs.
+
+        Returns:
+            Tuple of (ordered channel names, float32 correlation matrix)
+        """
+        result = correlation or self.correlation_matrix(df, parameters)
+        names, matrix = result['parameters'], result['matrix']
+        if len(names) > max_channels:
+            strength = np.abs(np.nan_to_num(matrix, nan=0.0))
+            np.fill_diagonal(strength, 0.0)
+            chosen = np.sort(np.argsort(strength.max(axis=1))[::-1][:max_channels])
+            names = [names[i] for i in chosen]
+            matrix = matrix[np.ix_(chosen, chosen)]
+
+        if len(names) > 2:
+            distance = 1.0 - np.abs(np.nan_to_num(matrix.astype(np.float64), nan=0.0))
+            distance = np.clip((distance + distance.T) / 2.0, 0.0, None)
+            np.fill_diagonal(distance, 0.0)
+            order = leaves_list(linkage(squareform(distance, checks=False), method='average',
+                                        optimal_ordering=True))
+            names = [names[i] for i in order]
+            matrix = matrix[np.ix_(order, order)]
+        return names, matrix
@@ -0,0 +1,303 @@
+import os
+import json
+import time
+import shutil
+import hashlib
+import tempfile
+import numpy as np
+import pandas as pd
+from collections import OrderedDict
+from typing import Dict, List, Any, Hashable, Optional, Tuple
+
+
+class DataCache:
+    """
+    Persistent on-disk cache of processed flight DataFrames.
+
+    Entries are keyed by a content hash of the raw upload plus the
+    processing version, and stored column by column as NumPy ``.npy``
+    files next to a JSON manifest. The cache is bounded in size and
+    evicts the least recently used entries first.
+    """
+
+    MANIFEST = 'manifest.json'
+
+    def __init__(self, cache_dir: Optional[str] = None, max_bytes: int = 2 * 1024 ** 3):
+        """
+        Args:
+            cache_dir: Directory holding cache entries; defaults to
+                $FLIGHT_ANALYZER_CACHE_DIR or ~/.cache/enhanced_flight_analyzer
+            max_bytes: Total size budget for all entries
+        """
+        self.cache_dir = cache_dir or os.environ.get(
+            'FLIGHT_ANALYZER_CACHE_DIR',
+            os.path.join(os.path.expanduser('~'), '.cache', 'enhanced_flight_analyzer')
+        )
+        self.max_bytes = max_bytes
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    @staticmethod
+    def make_key(source, version: str, options: Optional[Dict[str, Any]] = None,
+                 block_size: int = 1024 * 1024) -> str:
+        """
+        Build a cache key from the raw file content, processor version and load options.
+
+        Args:
+            source: Raw file bytes, or a seekable binary stream that is hashed
+                in blocks and rewound to its original position
+            version: Processing version; bump it whenever processing output changes
+            options: Load options that change the processed result
+        """
+        digest = hashlib.blake2b(digest_size=20)
+        if isinstance(source, (bytes, bytearray, memoryview)):
+            digest.update(source)
+        else:
+            position = source.tell()
+            for block in iter(lambda: source.read(block_size), b''):
+                digest.update(block)
+            source.seek(position)
+        digest.update(version.encode('utf-8'))
+        digest.update(json.dumps(options or {}, sort_keys=True, default=str).encode('utf-8'))
+        return digest.hexdigest()
+
+    @staticmethod
+    def frame_key(df: pd.DataFrame, columns: Optional[List[str]] = None) -> str:
+        """
+        Build an identity key for an in-memory DataFrame.
+
+        Frames that carry ``attrs['source_key']`` (set by the loader and by
+        the app for every upload) are identified by that key together with
+        their shape, column names and dtypes, which costs nothing per row.
+        Code that derives a frame with different values but the same shape
+        must give it a new source key, as resample_uniform does. Frames
+        without a source key fall back to hashing every value: numeric and
+        datetime columns from their raw buffers, other columns through
+        pandas' row hashes.
+
+        Args:
+            df: DataFrame to identify
+            columns: Only identify these columns (e.g. the ones a chart
+                plots), so unrelated columns can change without changing the key
+        """
+        wanted = set(df.columns if columns is None else columns)
+        positions = [idx for idx, col in enumerate(df.columns) if col in wanted]
+        dtypes = df.dtypes.tolist()
+        digest = hashlib.sha1(usedforsecurity=False)
+        source_key = df.attrs.get('source_key')
+        digest.update(repr((source_key, (len(df), len(positions)),
+                            [str(df.columns[idx]) for idx in positions],
+                            [str(dtypes[idx]) for idx in positions])).encode('utf-8'))
+        if source_key is None:
+            # Column by column, so no subset of the frame is ever copied
+            for idx in positions:
+                series = df.iloc[:, idx]
+                if isinstance(series.dtype, np.dtype) and series.dtype.kind in 'biufcmM':
+                    digest.update(np.ascontiguousarray(series.to_numpy()).view(np.uint8))
+                else:
+                    digest.update(pd.util.hash_pandas_object(series, index=False).to_numpy().tobytes())
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[pd.DataFrame]:
+        """
+        Load a cached DataFrame, or return None on a miss or unreadable entry.
+        """
+        entry_dir = os.path.join(self.cache_dir, key)
+        manifest_path = os.path.join(entry_dir, self.MANIFEST)
+        if not os.path.exists(manifest_path):
+            return None
+
+        try:
+            with open(manifest_path, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+
+            arrays = {}
+            for idx, column in enumerate(manifest['columns']):
+                arrays[idx] = self._load_column(entry_dir, idx, column)
+
+            df = pd.DataFrame(arrays, copy=False)
+            df.columns = [column['name'] for column in manifest['columns']]
+            df.attrs['cache_metadata'] = manifest.get('metadata', {})
+
+            # Record the access for LRU ordering
+            os.utime(manifest_path)
+            return df
+
+        except (OSError, ValueError, KeyError):
+            shutil.rmtree(entry_dir, ignore_errors=True)
+            return None
+
+    def get_metadata(self, key: str) -> Dict[str, Any]:
+        """
+        Return the metadata stored with an entry without loading its columns.
+        """
+        manifest_path = os.path.join(self.cache_dir, key, self.MANIFEST)
+        try:
+            with open(manifest_path, 'r', encoding='utf-8') as f:
+                return json.load(f).get('metadata', {})
+        except (OSError, ValueError):
+            return {}
+
+    def put(self, key: str, df: pd.DataFrame, metadata: Optional[Dict[str, Any]] = None):
+        """
+        Store a processed DataFrame under ``key`` and enforce the size budget.
+
+        Entries are written to a temporary directory and renamed into place,
+        so concurrent sessions never observe a partially written entry.
+        """
+        entry_dir = os.path.join(self.cache_dir, key)
+        if os.path.exists(os.path.join(entry_dir, self.MANIFEST)):
+            return
+
+        tmp_dir = tempfile.mkdtemp(prefix=f'.{key}.', dir=self.cache_dir)
+        try:
+            columns = []
+            for idx, name in enumerate(df.columns):
+                columns.append(self._save_column(tmp_dir, idx, name, df.iloc[:, idx]))
+
+            manifest = {
+                'created': time.time(),
+                'rows': len(df),
+                'columns': columns,
+                'metadata': metadata or {}
+            }
+            with open(os.path.join(tmp_dir, self.MANIFEST), 'w', encoding='utf-8') as f:
+                json.dump(manifest, f, default=str)
+
+            os.replace(tmp_dir, entry_dir)
+        except OSError:
+            # Another session stored the same entry first, or the disk is full
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            return
+
+        self.evict()
+
+    def evict(self):
+        """
+        Delete least recently used entries until the cache fits its budget.
+        """
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            entry_dir = os.path.join(self.cache_dir, name)
+            manifest_path = os.path.join(entry_dir, self.MANIFEST)
+            if name.startswith('.') or not os.path.exists(manifest_path):
+                continue
+            size = sum(entry.stat().st_size for entry in os.scandir(entry_dir))
+            entries.append((os.path.getmtime(manifest_path), size, entry_dir))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, entry_dir in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(entry_dir, ignore_errors=True)
+            total -= size
+
+    def clear(self):
+        """Remove every cache entry."""
+        for name in os.listdir(self.cache_dir):
+            shutil.rmtree(os.path.join(self.cache_dir, name), ignore_errors=True)
+
+    def _save_column(self, entry_dir: str, idx: int, name: str, series: pd.Series) -> Dict[str, Any]:
+        """
+        Write one column as .npy files and return its manifest record.
+
+        Numeric, boolean and datetime columns are stored natively; text
+        columns are stored as a fixed-width unicode array plus a null mask
+        so that no pickled objects ever touch the disk.
+        """
+        record = {'name': name, 'dtype': str(series.dtype), 'kind': 'native'}
+        values = series.to_numpy()
+
+        if values.dtype == object or not (pd.api.types.is_numeric_dtype(series) or
+                                          pd.api.types.is_bool_dtype(series) or
+                                          pd.api.types.is_datetime64_any_dtype(series)):
+            mask = series.isna().to_numpy()
+            values = np.where(mask, '', series.astype(object).to_numpy()).astype(str)
+            np.save(os.path.join(entry_dir, f'{idx}.mask.npy'), mask)
+            record['kind'] = 'text'
+
+        np.save(os.path.join(entry_dir, f'{idx}.npy'), values, allow_pickle=False)
+        return record
+
+    def _load_column(self, entry_dir: str, idx: int, record: Dict[str, Any]):
+        """
+        Read one column written by _save_column.
+        """
+        values = np.load(os.path.join(entry_dir, f'{idx}.npy'), allow_pickle=False)
+        if record['kind'] != 'text':
+            return values
+
+        mask = np.load(os.path.join(entry_dir, f'{idx}.mask.npy'), allow_pickle=False)
+        text = values.astype(object)
+        text[mask] = np.nan
+        try:
+            return pd.Series(text).astype(record['dtype']).array if record['dtype'] != 'object' else text
+        except (TypeError, ValueError):
+            return text
+
+
+class LRUCache:
+    """
+    Bounded in-memory cache that evicts the least recently used entries first.
+
+    Components keep their caches (profiles, spectra, correlation matrices,
+    figures, resampled channels) in an LRUCache held as a class attribute,
+    so every instance shares one cache. Streamlit re-executes the app
+    script on each widget change and may construct fresh components; only
+    state held on the class outlives them, which lets a rerun reuse what
+    the previous one computed. A component's constructor arguments set the
+    bounds of its shared cache.
+    """
+
+    def __init__(self, max_entries: Optional[int] = None, max_bytes: Optional[int] = None):
+        """
+        Args:
+            max_entries: Number of entries kept (None for no limit)
+            max_bytes: Budget for the sizes reported to put() (None for no limit)
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self._entries: 'OrderedDict[Hashable, Tuple[Any, int]]' = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the value stored under ``key`` and mark it as recently used."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return default
+        self._entries.move_to_end(key)
+        return entry[0]
+
+    def put(self, key: Hashable, value: Any, nbytes: int = 0) -> bool:
+        """
+        Store a value and evict least recently used entries beyond the bounds.
+
+        Args:
+            key: Hashable cache key
+            value: Value to store
+            nbytes: Size of the value counted against ``max_bytes``
+
+        Returns:
+            False when the value alone exceeds ``max_bytes`` and was not stored
+        """
+        if self.max_bytes is not None and nbytes > self.max_bytes:
+            return False
+        if key in self._entries:
+            self.nbytes -= self._entries.pop(key)[1]
+        self._entries[key] = (value, nbytes)
+        self.nbytes += nbytes
+        while ((self.max_entries is not None and len(self._entries) > self.max_entries) or
+               (self.max_bytes is not None and self.nbytes > self.max_bytes)):
+            _, (_, evicted) = self._entries.popitem(last=False)
+            self.nbytes -= evicted
+        return True
+
+    def clear(self):
+        """Drop every entry."""
+        self._entries.clear()
+        self.nbytes = 0
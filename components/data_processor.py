@@ -3,64 +3,673 @@ import numpy as np
 import streamlit as st
 from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime
+import codecs
+import csv
 import io
+import itertools
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+except ImportError:  # pandas keeps text in Python objects without pyarrow
+    pa = None
+
+from components.data_cache import DataCache, LRUCache
+from components.data_profiler import DataProfiler
+from components.flight_param_limits import PARAM_LIMITS
 
 class DataProcessor:
     """
     Handles data loading, processing, and validation for flight test data.
     """
     
-    def __init__(self):
+    # Bump whenever a change to the processing pipeline alters its output,
+    # so that on-disk cache entries from older versions are not reused
+    version = '2.3.0'
+    
+    # Resampled channels, so charts and exports requesting the same grid
+    # reuse one interpolation
+    _resample_cache = LRUCache(max_bytes=512 * 1024 ** 2)
+    
+    def __init__(self, cache: Optional[DataCache] = None, compact_dtypes: bool = False):
+        """
+        Args:
+            cache: Optional on-disk cache of processed DataFrames
+            compact_dtypes: Store channels in the smallest dtype that preserves
+                their recorded precision (float32 analogs, 1-byte discretes)
+        """
+        self.cache = cache
+        self.compact_dtypes = compact_dtypes
+        self.profiler = DataProfiler()
         self.supported_formats = ['.csv', '.txt']
         self.required_columns = ['Timestamp', 'Elapsed Time (s)']
+        self.scan_block_size = 8 * 1024 * 1024  # Bytes scanned per block when counting fields
+        self.conversion_workers = os.cpu_count() or 1  # Threads used for numeric conversion
+        self.timestamp_formats = [
+            '%j:%H:%M:%S.%f',  # day:hour:minute:second.millisecond
+            '%Y-%m-%d %H:%M:%S.%f',  # Standard datetime with milliseconds
+            '%Y-%m-%d %H:%M:%S',  # Standard datetime
+            '%H:%M:%S.%f',  # Time only with milliseconds
+            '%H:%M:%S'  # Time only
+        ]
+        self.timestamp_sample_size = 1000  # Rows sampled for timestamp format detection
+        self.timestamp_format = None  # Format detected by the most recent load
+        self.messages: List[Tuple[str, str]] = []  # (level, text) emitted by the most recent load
+        self.diagnostics: Dict[str, Any] = {}  # Structured malformed-row and conversion summary
     
     def load_data(self, file) -> pd.DataFrame:
         """
         Enhanced data loading with proper parsing and validation.
         
+        The two header rows are decoded in Python; the data body is handed
+        to pandas' compiled C reader so numeric channels arrive as typed
+        columns without building an intermediate list of strings.
+        
         Args:
             file: Uploaded file object from Streamlit
             
         Returns:
             Processed DataFrame or empty DataFrame if loading fails
         """
+        self.messages = []
+        self.diagnostics = {}
         try:
-            # Read the file content
-            content = file.read().decode('utf-8-sig')
-            lines = content.strip().split('\n')
+            # Read the raw bytes; decoding is left to the CSV engine
+            raw = file.read()
+            if isinstance(raw, str):
+                raw = raw.encode('utf-8')
+            
+            # Identifies the dataset in the disk cache and in per-dataset caches
+            source_key = DataCache.make_key(raw, self.version, self._cache_options())
+            if self.cache is not None:
+                cached = self.cache.get(source_key)
+                if cached is not None:
+                    self._restore_cache_metadata(cached.attrs['cache_metadata'])
+                    cached.attrs['source_key'] = source_key
+                    return cached
             
-            if len(lines) < 3:
-                st.error("File must have at least 2 header rows and 1 data row")
+            body_start, header_lines = self._read_header_lines(raw)
+            
+            if len(header_lines) < 2 or body_start >= len(raw):
+                self._notify('error', "File must have at least 2 header rows and 1 data row")
                 return pd.DataFrame()
             
             # Parse the header lines
-            header1 = lines[0].split(',')  # Parameter names/descriptions
-            header2 = lines[1].split(',')  # Units
+            header1 = header_lines[0].split(',')  # Parameter names/descriptions
+            header2 = header_lines[1].split(',')  # Units
             
             # Create proper column names
             columns = self._create_column_names(header1, header2)
             
             # Parse the data rows
-            data_rows = self._parse_data_rows(lines[2:], len(columns))
+            df = self._read_data_body(raw, body_start, columns)
             
-            if not data_rows:
-                st.error("No valid data rows found")
+            if df.empty:
+                self._notify('error', "No valid data rows found")
                 return pd.DataFrame()
             
-            # Create DataFrame
-            df = pd.DataFrame(data_rows, columns=columns)
-            
             # Process and validate data
             df = self._process_timestamps(df)
             df = self._convert_numeric_columns(df)
             df = self._calculate_derived_columns(df)
+            df.attrs['source_key'] = source_key
             df = self._validate_data_quality(df)
+            if self.compact_dtypes:
+                df = self._compact_columns(df)
+            
+            if self.cache is not None and not df.empty:
+                self.cache.put(source_key, df, metadata=self._cache_metadata())
             
             return df
             
         except Exception as e:
-            st.error(f"Error loading data: {e}")
+            self._notify('error', f"Error loading data: {e}")
+            return pd.DataFrame()
+    
+    def load_data_streaming(self, file, chunk_rows: int = 50000,
+                            max_memory_mb: Optional[float] = None) -> Optional['ColumnStore']:
+        """
+        Load a large flight file in fixed-size row chunks with bounded memory.
+        
+        The upload is read through a generator pipeline: row chunks are
+        sliced off the stream, parsed with the C engine, then timestamped,
+        converted and given derived columns before being appended to a
+        ColumnStore. The raw text is never held in memory as a whole.
+        
+        Args:
+            file: Uploaded file object (any binary stream supporting line iteration)
+            chunk_rows: Maximum number of data rows per chunk
+            max_memory_mb: Optional ceiling for the per-chunk working set; the
+                chunk size is reduced after the first chunk to respect it
+            
+        Returns:
+            Finalized ColumnStore, or None if loading fails
+        """
+        self.messages = []
+        self.diagnostics = {}
+        try:
+            # Identifies the dataset in the disk cache and in per-dataset caches
+            source_key = DataCache.make_key(file, self.version, self._cache_options())
+            if self.cache is not None:
+                cached = self.cache.get(source_key)
+                if cached is not None:
+                    self._restore_cache_metadata(cached.attrs['cache_metadata'])
+                    return ColumnStore.from_dataframe(cached)
+            
+            header_lines = self._read_stream_header(file)
+            if len(header_lines) < 2:
+                self._notify('error', "File must have at least 2 header rows and 1 data row")
+                return None
+            
+            columns = self._create_column_names(header_lines[0].split(','), header_lines[1].split(','))
+            state = {
+                'columns': columns,
+                'chunk_rows': chunk_rows,
+                'max_memory_bytes': max_memory_mb * 1024 * 1024 if max_memory_mb else None,
+                'bytes_per_row': None,
+                'timestamp_format': None,
+                'rollover': {},
+                'numeric_columns': None,
+                'start_time': None,
+                'invalid_timestamps': 0,
+                'stored_rows': 0,
+                'valid_counts': {},
+                'text_chunks': {},
+                'total_rows': 0,
+                'ragged_counts': [],
+                'ragged_lines': []
+            }
+            
+            # Generator pipeline: raw row chunks -> parsed frames -> processed frames
+            raw_chunks = self._iter_row_chunks(file, state)
+            parsed_chunks = (self._parse_stream_chunk(raw, first_line, state)
+                             for raw, first_line in raw_chunks)
+            processed_chunks = (self._process_stream_chunk(chunk, state)
+                                for chunk in parsed_chunks)
+            
+            store = None
+            for chunk in processed_chunks:
+                if chunk.empty:
+                    continue
+                if store is None:
+                    store = ColumnStore(list(chunk.columns))
+                store.append(chunk)
+            
+            if store is None or len(store) == 0:
+                self._notify('error', "No valid data rows found")
+                return None
+            
+            store.finalize()
+            self._split_stream_columns(store, state)
+            self._report_stream_summary(store, state)
+            
+            # Quality checks run on a zero-copy frame view of the store
+            view = store.to_dataframe()
+            view.attrs['source_key'] = source_key
+            validated = self._validate_data_quality(view)
+            store.drop_columns([col for col in store.columns if col not in validated.columns])
+            if self.compact_dtypes:
+                self._compact_columns(store)
+            self.timestamp_format = state['timestamp_format']
+            store.metadata.update(self._cache_metadata())
+            
+            if self.cache is not None:
+                self.cache.put(source_key, store.to_dataframe(), metadata=store.metadata)
+            
+            return store
+            
+        except Exception as e:
+            self._notify('error', f"Error loading data: {e}")
+            return None
+    
+    def open_projection(self, file) -> Optional['ColumnProjection']:
+        """
+        Open an uploaded flight file for column-projected loading.
+        
+        Only the two header rows are read here; the returned projection
+        parses individual channels from the upload when they are requested.
+        
+        Args:
+            file: Uploaded file object (seekable binary stream)
+            
+        Returns:
+            ColumnProjection over the file, or None if the header is invalid
+        """
+        self.messages = []
+        self.diagnostics = {}
+        try:
+            file.seek(0)
+            header_lines = self._read_stream_header(file)
+            if len(header_lines) < 2:
+                self._notify('error', "File must have at least 2 header rows and 1 data row")
+                return None
+            
+            columns = self._create_column_names(header_lines[0].split(','), header_lines[1].split(','))
+            return ColumnProjection(self, file, columns, file.tell())
+            
+        except Exception as e:
+            self._notify('error', f"Error loading data: {e}")
+            return None
+    
+    def _cache_options(self) -> Dict[str, Any]:
+        """
+        Load options that change the processed output and so belong in the cache key.
+        """
+        return {'compact_dtypes': self.compact_dtypes}
+    
+    def _cache_metadata(self) -> Dict[str, Any]:
+        """
+        Load state stored alongside a cached result.
+        """
+        return {'timestamp_format': self.timestamp_format, 'messages': self.messages,
+                'diagnostics': self.diagnostics}
+    
+    def _restore_cache_metadata(self, metadata: Dict[str, Any]):
+        """
+        Restore load state from a cache hit and replay the original messages.
+        """
+        self.timestamp_format = metadata.get('timestamp_format')
+        self.diagnostics = self._restore_diagnostics(metadata.get('diagnostics', {}))
+        for level, message in metadata.get('messages', []):
+            self._notify(level, message)
+    
+    @staticmethod
+    def _restore_diagnostics(diagnostics: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Undo the JSON round trip of cached diagnostics.
+        
+        The manifest turns the column-count histogram's int keys into
+        strings and the (start, end) line ranges into lists; restore both
+        so cache hits report exactly what a fresh load does.
+        """
+        diagnostics = dict(diagnostics)
+        rows = diagnostics.get('rows')
+        if rows:
+            rows = dict(rows)
+            rows['column_count_histogram'] = {int(count): freq for count, freq
+                                              in rows.get('column_count_histogram', {}).items()}
+            for key in ('long_line_ranges', 'short_line_ranges'):
+                rows[key] = [tuple(line_range) for line_range in rows.get(key, [])]
+            diagnostics['rows'] = rows
+        return diagnostics
+    
+    def _notify(self, level: str, message: str):
+        """
+        Show a message in the UI and record it for headless callers and replay.
+        
+        Args:
+            level: Streamlit message level ('info', 'warning' or 'error')
+            message: Message text
+        """
+        self.messages.append((level, message))
+        getattr(st, level)(message)
+    
+    def _read_stream_header(self, file, count: int = 2) -> List[str]:
+        """
+        Read the header lines from the start of a binary stream.
+        """
+        lines = []
+        for line in file:
+            if not lines:
+                line = line[len(codecs.BOM_UTF8):] if line.startswith(codecs.BOM_UTF8) else line
+            text = line.decode('utf-8').rstrip('\r\n')
+            if not lines and not text.strip():
+                continue  # Skip leading blank lines
+            lines.append(text)
+            if len(lines) == count:
+                break
+        
+        return lines
+    
+    def _iter_row_chunks(self, file, state: Dict[str, Any]):
+        """
+        Yield (raw bytes, first line number) for consecutive row chunks.
+        
+        The chunk size is re-evaluated before every read so that the memory
+        estimate measured on earlier chunks can shrink later ones.
+        """
+        first_line = 3
+        while True:
+            rows = state['chunk_rows']
+            if state['max_memory_bytes']:
+                if state['bytes_per_row']:
+                    rows = int(min(rows, max(100, state['max_memory_bytes'] // state['bytes_per_row'])))
+                else:
+                    rows = min(rows, 1000)  # Small probe chunk to measure the row cost
+            
+            lines = list(itertools.islice(file, rows))
+            if not lines:
+                return
+            
+            yield b''.join(lines), first_line
+            first_line += len(lines)
+    
+    def _parse_stream_chunk(self, raw: bytes, first_line: int, state: Dict[str, Any]) -> pd.DataFrame:
+        """
+        Parse one raw row chunk and record its ragged rows for the summary.
+        """
+        columns = state['columns']
+        field_counts, line_numbers = self._scan_field_counts(raw, 0, first_line)
+        state['total_rows'] += len(field_counts)
+        ragged = field_counts != len(columns)
+        if ragged.any():
+            state['ragged_counts'].append(field_counts[ragged])
+            state['ragged_lines'].append(line_numbers[ragged])
+        
+        if len(field_counts) == 0:
+            return pd.DataFrame()
+        
+        chunk = self._parse_csv_body(raw, 0, columns)
+        
+        # Working set is roughly the raw text plus the parsed and converted frames
+        if len(chunk):
+            state['bytes_per_row'] = (len(raw) + 2 * chunk.memory_usage(deep=True).sum()) / len(chunk)
+        
+        return chunk
+    
+    def _process_stream_chunk(self, chunk: pd.DataFrame, state: Dict[str, Any]) -> pd.DataFrame:
+        """
+        Apply timestamp parsing, numeric conversion and derived columns to a chunk.
+        
+        The timestamp format is decided on the first chunk and reused for
+        the rest of the stream. Every channel is stored as numbers; chunks
+        the CSV engine read as text also keep their cells, so that
+        _split_stream_columns can turn channels that fail the 80% rule over
+        the whole file back into text.
+        """
+        if chunk.empty or 'Timestamp' not in chunk.columns:
+            return pd.DataFrame()
+        
+        if state['timestamp_format'] is None:
+            state['timestamp_format'] = self._detect_timestamp_format(chunk['Timestamp'])
+            if state['timestamp_format'] is None:
+                raise ValueError("Could not parse timestamps. Expected formats: "
+                                 "day:hour:minute:second.millisecond or standard datetime")
+        
+        timestamps = self._parse_timestamps(chunk['Timestamp'], state['timestamp_format'],
+                                            rollover_state=state['rollover'])
+        valid_mask = timestamps.notna()
+        state['invalid_timestamps'] += int((~valid_mask).sum())
+        chunk['Timestamp'] = timestamps
+        if not valid_mask.all():
+            chunk = chunk[valid_mask].reset_index(drop=True)
+        if chunk.empty:
+            return chunk
+        
+        # Every channel is converted in every chunk, so each keeps one dtype
+        # across appends; the numeric/text split waits for the full counts
+        pending = [col for col in chunk.columns
+                   if col != 'Timestamp' and not pd.api.types.is_numeric_dtype(chunk[col])]
+        converted = self._map_columns(self._to_numeric, [chunk[col] for col in pending])
+        for col, numeric_series in zip(pending, converted):
+            # Keep the cells as read in case the channel turns out to be text
+            state['text_chunks'].setdefault(col, []).append((state['stored_rows'], chunk[col].to_numpy()))
+            chunk[col] = numeric_series
+        
+        for col in chunk.columns:
+            if col != 'Timestamp':
+                state['valid_counts'][col] = state['valid_counts'].get(col, 0) + int(chunk[col].notna().sum())
+        state['stored_rows'] += len(chunk)
+        
+        if state['start_time'] is None:
+            state['start_time'] = chunk['Timestamp'].min()
+        chunk['Elapsed Time (s)'] = (chunk['Timestamp'] - state['start_time']).dt.total_seconds()
+        
+        return chunk
+    
+    def _split_stream_columns(self, store: 'ColumnStore', state: Dict[str, Any]):
+        """
+        Apply the numeric/text rule of _convert_numeric_columns to a streamed load.
+        
+        Channels with more than 80% valid numbers over all chunks stay
+        numeric. The others become text again: chunks read as text restore
+        their original cells, chunks the CSV engine typed as numbers are
+        formatted back from their values, and missing values become ''.
+        """
+        state['numeric_columns'] = []
+        for col in state['columns'][1:]:
+            if col not in store or col == 'Elapsed Time (s)':
+                continue
+            if state['valid_counts'].get(col, 0) / len(store) > 0.8:
+                state['numeric_columns'].append(col)
+                continue
+            
+            values = store[col]
+            text = np.where(pd.isna(values), '', values.astype(str)).astype(object)
+            for start, cells in state['text_chunks'].get(col, []):
+                text[start:start + len(cells)] = cells
+            store.replace_column(col, text)
+        state['text_chunks'] = {}
+    
+    def _report_stream_summary(self, store: 'ColumnStore', state: Dict[str, Any]):
+        """
+        Emit the per-file messages of a streamed load once, after the last chunk.
+        """
+        ragged_counts = state['ragged_counts'] or [np.empty(0, dtype=np.int64)]
+        ragged_lines = state['ragged_lines'] or [np.empty(0, dtype=np.int64)]
+        self._report_ragged_rows(np.concatenate(ragged_counts), np.concatenate(ragged_lines),
+                                 len(state['columns']), total_rows=state['total_rows'])
+        
+        if state['invalid_timestamps']:
+            self._notify('warning', f"Removed {state['invalid_timestamps']} rows with invalid timestamps")
+        
+        self._report_column_conversions(
+            {col: len(store) - state['valid_counts'][col] for col in state['numeric_columns']},
+            [col for col in state['columns'][1:] if col not in state['numeric_columns']]
+        )
+        
+        elapsed = store['Elapsed Time (s)']
+        if len(elapsed) > 1:
+            median_interval = np.median(np.diff(elapsed))
+            if median_interval > 0:
+                sampling_rate = 1.0 / median_interval
+                self._notify('info', f"Detected sampling rate: {sampling_rate:.1f} Hz (interval: {median_interval:.3f}s)")
+    
+    def _read_header_lines(self, raw: bytes, count: int = 2) -> Tuple[int, List[str]]:
+        """
+        Decode the leading header lines of a raw upload.
+        
+        Returns:
+            Byte offset where the data body starts and the decoded header lines
+        """
+        offset = len(codecs.BOM_UTF8) if raw.startswith(codecs.BOM_UTF8) else 0
+        
+        # Skip leading blank lines, as the original line-splitting parser did
+        while offset < len(raw) and raw[offset:offset + 1] in (b'\n', b'\r', b' ', b'\t'):
+            offset += 1
+        
+        lines = []
+        while len(lines) < count and offset < len(raw):
+            end = raw.find(b'\n', offset)
+            if end == -1:
+                end = len(raw)
+            lines.append(raw[offset:end].decode('utf-8').rstrip('\r'))
+            offset = end + 1
+        
+        return offset, lines
+    
+    def _scan_field_counts(self, raw: bytes, offset: int,
+                           first_line: int = 3) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Count the fields on every non-blank line of the data body.
+        
+        Works on the raw bytes in fixed-size blocks with NumPy, so ragged
+        row detection stays vectorized and memory stays bounded.
+        
+        Returns:
+            Tuple of (field counts, 1-based file line numbers) for non-blank lines
+        """
+        data = np.frombuffer(raw, dtype=np.uint8)[offset:]
+        if len(data) == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+        
+        newline_chunks = []
+        comma_chunks = []
+        carry = 0  # Commas on a line that continues into the next block
+        for start in range(0, len(data), self.scan_block_size):
+            block = data[start:start + self.scan_block_size]
+            newline_pos = np.flatnonzero(block == 10)  # ord('\n')
+            segment_starts = np.concatenate(([0], newline_pos + 1))
+            segment_starts = segment_starts[segment_starts < len(block)]
+            segment_commas = np.add.reduceat((block == 44).view(np.uint8),  # ord(',')
+                                             segment_starts, dtype=np.int64)
+            segment_commas[0] += carry
+            
+            complete = len(newline_pos)
+            carry = int(segment_commas[complete]) if len(segment_commas) > complete else 0
+            newline_chunks.append(newline_pos + start)
+            comma_chunks.append(segment_commas[:complete])
+        
+        newlines = np.concatenate(newline_chunks)
+        line_commas = np.concatenate(comma_chunks)
+        
+        # A final line without a trailing newline still counts
+        if len(newlines) == 0 or newlines[-1] != len(data) - 1:
+            newlines = np.append(newlines, len(data))
+            line_commas = np.append(line_commas, carry)
+        
+        line_starts = np.concatenate(([0], newlines[:-1] + 1))
+        line_lengths = newlines - line_starts
+        field_counts = line_commas + 1
+        
+        # Blank lines (including a lone CR from CRLF files) are skipped
+        last_char = data[np.clip(newlines - 1, 0, len(data) - 1)]
+        blank = (line_lengths == 0) | ((line_lengths == 1) & (last_char == 13))
+        
+        line_numbers = np.arange(first_line, first_line + len(newlines), dtype=np.int64)
+        return field_counts[~blank], line_numbers[~blank]
+    
+    def _read_data_body(self, raw: bytes, offset: int, columns: List[str]) -> pd.DataFrame:
+        """
+        Parse the data body with the vectorized C CSV engine.
+        
+        Rows with extra fields are truncated and short rows are padded with
+        missing values, matching the line-by-line parser; both are reported
+        once in aggregate instead of once per line.
+        """
+        field_counts, line_numbers = self._scan_field_counts(raw, offset)
+        
+        if len(field_counts) == 0:
             return pd.DataFrame()
+        
+        self._report_ragged_rows(field_counts, line_numbers, len(columns))
+        
+        return self._parse_csv_body(raw, offset, columns)
+    
+    def _report_ragged_rows(self, field_counts: np.ndarray, line_numbers: np.ndarray,
+                            expected_columns: int, total_rows: Optional[int] = None):
+        """
+        Summarize malformed rows into ``self.diagnostics['rows']`` and emit one message.
+        
+        Args:
+            field_counts: Field counts of the rows to summarize (all rows, or
+                only the malformed ones when ``total_rows`` is given)
+            line_numbers: File line numbers matching ``field_counts``
+            expected_columns: Number of columns defined by the header
+            total_rows: Total number of data rows, when only malformed rows are passed
+        """
+        malformed = field_counts != expected_columns
+        total_rows = len(field_counts) if total_rows is None else total_rows
+        
+        counts, frequencies = np.unique(field_counts[malformed], return_counts=True)
+        histogram = {int(count): int(freq) for count, freq in zip(counts, frequencies)}
+        well_formed = total_rows - int(malformed.sum())
+        if well_formed:
+            histogram[expected_columns] = well_formed
+        
+        long_lines = line_numbers[field_counts > expected_columns]
+        short_lines = line_numbers[field_counts < expected_columns]
+        
+        summary = {
+            'expected_columns': expected_columns,
+            'total_rows': int(total_rows),
+            'malformed_rows': int(malformed.sum()),
+            'long_rows': len(long_lines),
+            'short_rows': len(short_lines),
+            'column_count_histogram': dict(sorted(histogram.items())),
+            'long_line_ranges': self._line_ranges(long_lines),
+            'short_line_ranges': self._line_ranges(short_lines)
+        }
+        self.diagnostics['rows'] = summary
+        
+        if summary['malformed_rows']:
+            ranges = summary['short_line_ranges'] + summary['long_line_ranges']
+            first = min(ranges)[0]
+            self._notify('warning', f"{summary['malformed_rows']} malformed rows "
+                                    f"({summary['long_rows']} with extra columns truncated, "
+                                    f"{summary['short_rows']} with missing columns padded), "
+                                    f"first at line {first}")
+    
+    def _line_ranges(self, line_numbers: np.ndarray, max_ranges: int = 20) -> List[Tuple[int, int]]:
+        """
+        Collapse sorted line numbers into up to ``max_ranges`` inclusive (start, end) runs.
+        """
+        if len(line_numbers) == 0:
+            return []
+        breaks = np.flatnonzero(np.diff(line_numbers) != 1)
+        starts = np.concatenate(([line_numbers[0]], line_numbers[breaks + 1]))
+        ends = np.concatenate((line_numbers[breaks], [line_numbers[-1]]))
+        return [(int(a), int(b)) for a, b in zip(starts[:max_ranges], ends[:max_ranges])]
+    
+    def _report_column_conversions(self, nan_counts: Dict[str, int], text_columns: List[str]):
+        """
+        Report numeric conversion problems for all columns in at most two messages.
+        """
+        self.diagnostics['non_numeric_values'] = {col: int(n) for col, n in nan_counts.items() if n}
+        self.diagnostics['text_columns'] = list(text_columns)
+        
+        converted = self.diagnostics['non_numeric_values']
+        if converted:
+            preview = ', '.join(f"'{col}' ({n})" for col, n in list(converted.items())[:5])
+            more = f" and {len(converted) - 5} more" if len(converted) > 5 else ""
+            self._notify('warning', f"Non-numeric values converted to NaN in {len(converted)} columns: "
+                                    f"{preview}{more}")
+        if text_columns:
+            preview = ', '.join(f"'{col}'" for col in text_columns[:5])
+            more = f" and {len(text_columns) - 5} more" if len(text_columns) > 5 else ""
+            self._notify('warning', f"Too many non-numeric values, keeping as text: {preview}{more}")
+    
+    def _parse_csv_body(self, raw: bytes, offset: int, columns: List[str]) -> pd.DataFrame:
+        """
+        Run the C CSV engine over raw body bytes starting at ``offset``.
+        """
+        expected_columns = len(columns)
+        body = io.BytesIO(raw)
+        body.seek(offset)
+        
+        try:
+            df = pd.read_csv(
+                body,
+                header=None,
+                names=list(range(expected_columns)),
+                usecols=list(range(expected_columns)),
+                dtype={0: str},
+                engine='c',
+                encoding='utf-8',
+                quoting=csv.QUOTE_NONE,
+                skipinitialspace=True,
+                keep_default_na=False,
+                na_values=[''],
+                low_memory=False
+            )
+        except (pd.errors.ParserError, UnicodeDecodeError, ValueError):
+            # Fall back to the pure-Python parser for files the C engine rejects
+            lines = raw[offset:].decode('utf-8', errors='replace').split('\n')
+            data_rows = self._parse_data_rows(lines, expected_columns, report=False)
+            if not data_rows:
+                return pd.DataFrame()
+            return pd.DataFrame(data_rows, columns=columns)
+        
+        # The line-splitting parser stripped every cell and padded short rows
+        # with empty strings; only text columns need either here
+        for idx in range(expected_columns):
+            if not pd.api.types.is_numeric_dtype(df[idx]):
+                df[idx] = self._arrow_text(df[idx]).fillna('').str.strip()
+        
+        df.columns = columns
+        return df
     
     def _create_column_names(self, header1: List[str], header2: List[str]) -> List[str]:
         """
@@ -86,60 +695,68 @@ class DataProcessor:
         
         return columns
     
-    def _parse_data_rows(self, data_lines: List[str], expected_columns: int) -> List[List[str]]:
+    def _parse_data_rows(self, data_lines: List[str], expected_columns: int,
+                         report: bool = True) -> List[List[str]]:
         """
         Parse data rows and filter valid ones.
+        
+        Rows with extra columns are truncated and short rows are padded with
+        empty values. Malformed rows are summarized once into
+        ``self.diagnostics`` rather than reported line by line.
+        
+        Args:
+            data_lines: Raw data lines following the two header rows
+            expected_columns: Number of columns defined by the header
+            report: Summarize malformed rows; callers that already scanned the
+                raw bytes pass False
         """
         data_rows = []
+        field_counts = []
+        line_numbers = []
         for line_num, line in enumerate(data_lines, start=3):
             if line.strip():  # Skip empty lines
                 row = [cell.strip() for cell in line.split(',')]
+                field_counts.append(len(row))
+                line_numbers.append(line_num)
                 
                 # Validate row length
-                if len(row) == expected_columns:
-                    data_rows.append(row)
-                elif len(row) > expected_columns:
+                if len(row) > expected_columns:
                     # Truncate extra columns
-                    data_rows.append(row[:expected_columns])
-                    st.warning(f"Line {line_num}: Extra columns truncated")
+                    row = row[:expected_columns]
                 elif len(row) < expected_columns:
                     # Pad with empty values
                     row.extend([''] * (expected_columns - len(row)))
-                    data_rows.append(row)
-                    st.warning(f"Line {line_num}: Missing columns padded with empty values")
+                data_rows.append(row)
+        
+        if report:
+            self._report_ragged_rows(np.array(field_counts, dtype=np.int64),
+                                     np.array(line_numbers, dtype=np.int64), expected_columns)
         
         return data_rows
     
-    def _process_timestamps(self, df: pd.DataFrame) -> pd.DataFrame:
+    def _process_timestamps(self, df: pd.DataFrame, timestamp_format: Optional[str] = None) -> pd.DataFrame:
         """
         Process timestamp column and handle different formats.
+        
+        Args:
+            df: DataFrame with a raw 'Timestamp' text column
+            timestamp_format: Known format to use instead of detecting one
         """
         if 'Timestamp' not in df.columns:
-            st.error("Timestamp column not found")
+            self._notify('error', "Timestamp column not found")
             return df
         
-        # Try different timestamp formats
-        timestamp_formats = [
-            '%j:%H:%M:%S.%f',  # day:hour:minute:second.millisecond
-            '%Y-%m-%d %H:%M:%S.%f',  # Standard datetime with milliseconds
-            '%Y-%m-%d %H:%M:%S',  # Standard datetime
-            '%H:%M:%S.%f',  # Time only with milliseconds
-            '%H:%M:%S'  # Time only
-        ]
+        if timestamp_format is None:
+            timestamp_format = self._detect_timestamp_format(df['Timestamp'])
         
-        parsed_timestamps = None
-        for fmt in timestamp_formats:
-            try:
-                parsed_timestamps = pd.to_datetime(df['Timestamp'], format=fmt, errors='coerce')
-                if parsed_timestamps.notna().sum() > len(df) * 0.8:  # At least 80% valid
-                    break
-            except:
-                continue
+        parsed_timestamps = self._parse_timestamps(df['Timestamp'], timestamp_format)
         
         if parsed_timestamps is None or parsed_timestamps.notna().sum() == 0:
-            st.error("Could not parse timestamps. Expected formats: day:hour:minute:second.millisecond or standard datetime")
+            self._notify('error', "Could not parse timestamps. Expected formats: day:hour:minute:second.millisecond or standard datetime")
             return pd.DataFrame()
         
+        self.timestamp_format = timestamp_format
+        
         # Update DataFrame with parsed timestamps
         df['Timestamp'] = parsed_timestamps
         
@@ -147,37 +764,291 @@ class DataProcessor:
         valid_mask = df['Timestamp'].notna()
         if not valid_mask.all():
             invalid_count = (~valid_mask).sum()
-            st.warning(f"Removed {invalid_count} rows with invalid timestamps")
+            self._notify('warning', f"Removed {invalid_count} rows with invalid timestamps")
             df = df[valid_mask].reset_index(drop=True)
         
         if df.empty:
-            st.error("No valid timestamps found")
+            self._notify('error', "No valid timestamps found")
             return pd.DataFrame()
         
         return df
     
+    def _detect_timestamp_format(self, timestamps: pd.Series) -> Optional[str]:
+        """
+        Pick the first known format that parses at least 80% of the timestamps.
+        
+        Detection runs on an evenly spaced sample of the non-empty values, so
+        its cost does not grow with the file. Falls back to the last format
+        tried when none reaches the threshold, so partially parseable columns
+        still load.
+        """
+        non_null = timestamps.dropna()
+        if non_null.empty:
+            return None
+        
+        sample_idx = np.unique(np.linspace(0, len(non_null) - 1,
+                                           min(len(non_null), self.timestamp_sample_size)).astype(int))
+        sample = non_null.iloc[sample_idx]
+        non_null_ratio = len(non_null) / len(timestamps)
+        
+        detected = None
+        for fmt in self.timestamp_formats:
+            try:
+                parsed = pd.to_datetime(sample, format=fmt, errors='coerce')
+            except (ValueError, TypeError):
+                continue
+            detected = fmt
+            if parsed.notna().mean() * non_null_ratio > 0.8:  # At least 80% valid
+                break
+        
+        return detected
+    
+    def _parse_timestamps(self, timestamps: pd.Series, timestamp_format: Optional[str],
+                          rollover_state: Optional[Dict[str, Any]] = None) -> Optional[pd.Series]:
+        """
+        Parse a timestamp column with a fixed format, coercing failures to NaT.
+        
+        Day-of-year timestamps go through a dedicated vectorized parser.
+        Formats without a full date are unwrapped where the clock rolls over
+        (midnight for time-only formats, New Year for day-of-year formats).
+        
+        Args:
+            timestamps: Raw timestamp text
+            timestamp_format: strptime-style format to parse with
+            rollover_state: Carries rollover offsets between consecutive chunks
+                of the same stream; None for a one-shot parse
+        """
+        if timestamp_format is None:
+            return None
+        
+        try:
+            if timestamp_format == '%j:%H:%M:%S.%f':
+                parsed = self._parse_doy_timestamps(timestamps)
+            else:
+                parsed = pd.to_datetime(timestamps, format=timestamp_format, errors='coerce')
+        except (ValueError, TypeError):
+            return None
+        
+        if '%Y' in timestamp_format:
+            return parsed
+        
+        if rollover_state is None:
+            rollover_state = {}
+        
+        values = parsed.to_numpy(dtype='datetime64[ns]').astype(np.int64)
+        valid = parsed.notna().to_numpy()
+        
+        if timestamp_format.startswith('%j'):
+            values = self._unwrap_rollover(values, valid, rollover_state, year_rollover=True)
+        else:
+            values = self._unwrap_rollover(values, valid, rollover_state, year_rollover=False)
+        
+        return pd.Series(values.view('datetime64[ns]'), index=timestamps.index).where(valid)
+    
+    def _parse_doy_timestamps(self, timestamps: pd.Series) -> pd.Series:
+        """
+        Parse fixed-width ``DDD:HH:MM:SS[.fff]`` day-of-year timestamps numerically.
+        
+        The strings are viewed as a byte matrix and every field is decoded
+        with integer arithmetic on its fixed columns. Values that do not fit
+        the fixed layout fall back to the generic strptime path.
+        """
+        text = timestamps.astype(object)
+        lengths = text.str.len().to_numpy(dtype=float, na_value=np.nan)
+        candidate = (lengths >= 12) & (lengths <= 22)
+        
+        result = np.full(len(text), np.datetime64('NaT'), dtype='datetime64[ns]')
+        parsed_ok = np.zeros(len(text), dtype=bool)
+        
+        if candidate.any():
+            try:
+                encoded = np.array(text.to_numpy()[candidate], dtype='S')
+            except UnicodeEncodeError:
+                encoded = None
+            
+            if encoded is not None:
+                width = encoded.dtype.itemsize
+                chars = encoded.view(np.uint8).reshape(-1, width).astype(np.int64)
+                is_digit = (chars >= 48) & (chars <= 57)  # '0'..'9'
+                digits = np.where(is_digit, chars - 48, 0)
+                
+                def field(*cols):
+                    value = np.zeros(len(chars), dtype=np.int64)
+                    for col in cols:
+                        value = value * 10 + digits[:, col]
+                    return value
+                
+                day, hour, minute, second = field(0, 1, 2), field(4, 5), field(7, 8), field(10, 11)
+                layout_ok = (is_digit[:, [0, 1, 2, 4, 5, 7, 8, 10, 11]].all(axis=1) &
+                             (chars[:, 3] == 58) & (chars[:, 6] == 58) & (chars[:, 9] == 58))  # ':'
+                
+                fraction_ns = np.zeros(len(chars), dtype=np.int64)
+                if width > 12:
+                    # Fraction: '.' then 1-9 digits, right-padded with NUL bytes
+                    frac = chars[:, 13:]
+                    padding = np.maximum.accumulate(frac == 0, axis=1)
+                    frac_ok = (padding | is_digit[:, 13:]).all(axis=1) & ~(padding & is_digit[:, 13:]).any(axis=1)
+                    has_fraction = chars[:, 12] == 46  # '.'
+                    layout_ok &= np.where(has_fraction, frac_ok & ~padding[:, 0] & (frac.shape[1] <= 9),
+                                          chars[:, 12] == 0)
+                    for k in range(min(frac.shape[1], 9)):
+                        fraction_ns += digits[:, 13 + k] * 10 ** (8 - k)
+                
+                layout_ok &= ((day >= 1) & (day <= 366) & (hour < 24) & (minute < 60) & (second <= 61))
+                
+                total_ns = ((((day - 1) * 24 + hour) * 60 + minute) * 60 + second) * 10 ** 9 + fraction_ns
+                stamps = np.datetime64('1900-01-01', 'ns') + total_ns.astype('timedelta64[ns]')
+                
+                candidate_idx = np.flatnonzero(candidate)
+                result[candidate_idx[layout_ok]] = stamps[layout_ok]
+                parsed_ok[candidate_idx[layout_ok]] = True
+        
+        # Anything outside the fixed layout takes the generic strptime path
+        leftover = ~parsed_ok & timestamps.notna().to_numpy()
+        if leftover.any():
+            generic = pd.to_datetime(timestamps[leftover], format='%j:%H:%M:%S.%f', errors='coerce')
+            result[leftover] = generic.to_numpy(dtype='datetime64[ns]')
+        
+        return pd.Series(result, index=timestamps.index)
+    
+    def _unwrap_rollover(self, values: np.ndarray, valid: np.ndarray, state: Dict[str, Any],
+                         year_rollover: bool) -> np.ndarray:
+        """
+        Make clock values monotonic across midnight or New Year rollovers.
+        
+        A backward jump of more than half a period between consecutive valid
+        samples is treated as a rollover. For day-of-year clocks the period is
+        365 days, or 366 when the sample before the wrap was on day 366.
+        
+        Args:
+            values: Timestamps as int64 nanoseconds
+            valid: Mask of parsed (non-NaT) entries
+            state: Rollover carry ('last' raw value, accumulated 'offset'); updated in place
+            year_rollover: True for day-of-year clocks, False for time-of-day clocks
+        """
+        day_ns = 86400 * 10 ** 9
+        valid_idx = np.flatnonzero(valid)
+        if len(valid_idx) == 0:
+            return values
+        
+        raw = values[valid_idx]
+        previous = np.concatenate(([state.get('last', raw[0])], raw[:-1]))
+        threshold = (183 if year_rollover else 0.5) * day_ns
+        wraps = (raw - previous) < -threshold
+        
+        if year_rollover:
+            base_ns = np.datetime64('1900-01-01', 'ns').astype(np.int64)
+            previous_day = (previous - base_ns) // day_ns + 1
+            period = np.where(previous_day >= 366, 366, 365) * day_ns
+        else:
+            period = day_ns
+        
+        offsets = state.get('offset', 0) + np.cumsum(np.where(wraps, period, 0))
+        state['last'] = int(raw[-1])
+        state['offset'] = int(offsets[-1])
+        
+        unwrapped = values.copy()
+        unwrapped[valid_idx] = raw + offsets
+        return unwrapped
+    
     def _convert_numeric_columns(self, df: pd.DataFrame) -> pd.DataFrame:
         """
         Convert numeric columns and handle conversion errors.
+        
+        Columns typed by the CSV engine pass through; the remaining text
+        columns are converted on the worker pool. Converted columns are
+        written back one at a time in the calling thread, so workers never
+        touch the frame or Streamlit.
         """
-        for col in df.columns:
+        pending = [idx for idx, col in enumerate(df.columns)
+                   if col != 'Timestamp' and not pd.api.types.is_numeric_dtype(df.iloc[:, idx])]
+        converted = self._map_columns(self._to_numeric, [df.iloc[:, idx] for idx in pending])
+        pending = set(pending)
+        
+        nan_counts = {}
+        text_columns = []
+        for idx, col in enumerate(df.columns):
             if col != 'Timestamp':
-                # Attempt numeric conversion
-                numeric_series = pd.to_numeric(df[col], errors='coerce')
+                # Attempt numeric conversion (results arrive in column order)
+                already_numeric = idx not in pending
+                numeric_series = df.iloc[:, idx] if already_numeric else next(converted)
                 
                 # Check conversion success rate
                 valid_ratio = numeric_series.notna().sum() / len(df)
                 
                 if valid_ratio > 0.8:  # At least 80% valid numeric values
-                    df[col] = numeric_series
+                    if not already_numeric:
+                        df.isetitem(idx, numeric_series)
                     if valid_ratio < 1.0:
-                        invalid_count = numeric_series.isna().sum()
-                        st.warning(f"Column '{col}': {invalid_count} non-numeric values converted to NaN")
+                        nan_counts[col] = int(numeric_series.isna().sum())
                 else:
-                    st.warning(f"Column '{col}': Too many non-numeric values, keeping as text")
+                    text_columns.append(col)
         
+        self._report_column_conversions(nan_counts, text_columns)
         return df
     
+    def _map_columns(self, func, columns: List[pd.Series]):
+        """
+        Apply ``func`` to each column on the worker pool, yielding results in order.
+        
+        Falls back to a plain loop when there is a single worker or column.
+        """
+        workers = min(self.conversion_workers, len(columns))
+        if workers <= 1:
+            yield from map(func, columns)
+            return
+        
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            yield from pool.map(func, columns)
+    
+    @staticmethod
+    def _arrow_text(series: pd.Series) -> pd.Series:
+        """
+        Hold a text column as Arrow strings.
+        
+        pandas 3 already reads text that way; on pandas 2 the CSV engine
+        returns Python objects, which would keep stripping and _to_numeric
+        on the GIL. Returns the column unchanged without pyarrow.
+        """
+        if pa is None or getattr(series.dtype, 'storage', None) == 'pyarrow':
+            return series
+        return series.astype(pd.StringDtype('pyarrow'))
+    
+    # Plain decimal numbers; anything else is left to pd.to_numeric
+    DECIMAL_PATTERN = r'^[+-]?(\d+\.?\d*|\.\d+)([eE][+-]?\d+)?$'
+    
+    @classmethod
+    def _to_numeric(cls, series: pd.Series) -> pd.Series:
+        """
+        Coerce a text column to numbers, turning unparseable cells into NaN.
+        
+        Arrow-backed text is matched and cast with Arrow compute kernels,
+        which release the GIL so pool threads convert columns in parallel.
+        Only the cells the decimal pattern rejects (junk, 'inf', ...) go
+        through pd.to_numeric, and columns without any rejected cell are
+        handed to it whole, so results and dtypes match pd.to_numeric.
+        """
+        if pa is None or getattr(series.dtype, 'storage', None) != 'pyarrow':
+            return pd.to_numeric(series, errors='coerce')
+        
+        text = pa.array(series.array)
+        matched = pc.match_substring_regex(text, cls.DECIMAL_PATTERN)
+        rejected = pc.fill_null(pc.invert(matched), False).to_numpy(zero_copy_only=False)
+        if not rejected.any():
+            numbers = pd.to_numeric(series, errors='coerce')
+            if isinstance(numbers.dtype, pd.api.extensions.ExtensionDtype):
+                # pandas 2 returns nullable Int64/Float64 for string[pyarrow] input
+                dtype = numbers.dtype.numpy_dtype if not numbers.isna().any() else np.float64
+                numbers = pd.Series(numbers.to_numpy(dtype=dtype, na_value=np.nan),
+                                    index=series.index, name=series.name)
+            return numbers
+        
+        decimals = pc.if_else(matched, text, pa.scalar(None, text.type))
+        numbers = pc.cast(decimals, pa.float64()).to_numpy(zero_copy_only=False).copy()
+        numbers[rejected] = pd.to_numeric(series[rejected], errors='coerce').to_numpy(
+            dtype=np.float64, na_value=np.nan)
+        return pd.Series(numbers, index=series.index, name=series.name)
+    
     def _calculate_derived_columns(self, df: pd.DataFrame) -> pd.DataFrame:
         """
         Calculate derived columns like elapsed time.
@@ -193,38 +1064,140 @@ class DataProcessor:
                 median_interval = time_diffs.median()
                 if median_interval > 0:
                     sampling_rate = 1.0 / median_interval
-                    st.info(f"Detected sampling rate: {sampling_rate:.1f} Hz (interval: {median_interval:.3f}s)")
+                    self._notify('info', f"Detected sampling rate: {sampling_rate:.1f} Hz (interval: {median_interval:.3f}s)")
         
         return df
     
     def _validate_data_quality(self, df: pd.DataFrame) -> pd.DataFrame:
         """
         Validate data quality and provide feedback.
+        
+        All checks read one vectorized profile of the frame (see DataProfiler).
         """
+        profile = self.profiler.profile(df)
+        stats = profile['columns']
+        
         # Check for completely empty columns
-        empty_cols = df.columns[df.isnull().all()].tolist()
+        empty = (stats['nulls'] == profile['rows']).to_numpy()
+        empty_cols = stats.index[empty].tolist()
         if empty_cols:
-            st.warning(f"Empty columns detected: {empty_cols}")
+            self._notify('warning', f"Empty columns detected: {empty_cols}")
             df = df.drop(columns=empty_cols)
         
         # Check for duplicate timestamps
-        if 'Timestamp' in df.columns:
-            duplicate_timestamps = df['Timestamp'].duplicated().sum()
-            if duplicate_timestamps > 0:
-                st.warning(f"Found {duplicate_timestamps} duplicate timestamps")
+        if 'Timestamp' in df.columns and profile['duplicate_timestamps'] > 0:
+            self._notify('warning', f"Found {profile['duplicate_timestamps']} duplicate timestamps")
         
         # Check for constant values (might indicate sensor issues)
-        numeric_cols = df.select_dtypes(include=[np.number]).columns
-        for col in numeric_cols:
+        checked = stats[stats['numeric'].to_numpy() & ~empty]
+        for col, unique_values, constant, low_cardinality in zip(
+                checked.index, checked['unique'], checked['constant'], checked['low_cardinality']):
             if col not in ['Elapsed Time (s)']:
-                unique_values = df[col].nunique()
-                if unique_values == 1:
-                    st.warning(f"Column '{col}' has constant value: {df[col].iloc[0]}")
-                elif unique_values < len(df) * 0.01:  # Less than 1% unique values
-                    st.info(f"Column '{col}' has very few unique values ({unique_values})")
+                if constant:
+                    self._notify('warning', f"Column '{col}' has constant value: {df[col].iloc[0]}")
+                elif low_cardinality:  # Less than 1% unique values
+                    self._notify('info', f"Column '{col}' has very few unique values ({int(unique_values)})")
         
         return df
     
+    def _compact_columns(self, data):
+        """
+        Downcast channels to compact dtypes, one column at a time.
+        
+        Works on a DataFrame (returned) or a ColumnStore (updated in place),
+        so peak memory only grows by a single column during conversion.
+        """
+        before = self._nbytes(data)
+        for col in list(data.columns):
+            if col in self.required_columns:
+                continue
+            values = data[col] if isinstance(data, ColumnStore) else data[col].to_numpy()
+            compact = self._compact_array(col, values)
+            if compact is not values:
+                if isinstance(data, ColumnStore):
+                    data.replace_column(col, compact)
+                else:
+                    data[col] = compact
+        
+        after = self._nbytes(data)
+        if after < before:
+            self._notify('info', f"Compact dtypes: {before / 1e6:.1f} MB → {after / 1e6:.1f} MB")
+        return data
+    
+    def _nbytes(self, data) -> int:
+        """Resident size of the numeric payload of a DataFrame or ColumnStore."""
+        if isinstance(data, ColumnStore):
+            return data.nbytes
+        return int(data.memory_usage(index=False).sum())
+    
+    def _compact_array(self, name: str, values: np.ndarray) -> np.ndarray:
+        """
+        Pick the smallest dtype that represents a channel without losing precision.
+        
+        - 0/1 discretes become uint8
+        - other integral channels without gaps become the smallest fitting
+          integer type
+        - a channel that only reads 0 or 1 although PARAM_LIMITS allows values
+          above 1 (a counter or analog that happened to sit still) is never
+          given an integer type and follows the analog rule instead
+        - analog channels become float32 when float32 spacing at the channel's
+          peak magnitude stays below half the recorded quantization step
+        
+        Returns the input array unchanged when no compact dtype applies.
+        """
+        if values.dtype.kind not in 'iuf' or values.itemsize <= 1:
+            return values
+        
+        floats = values.astype(np.float64, copy=False)
+        finite = np.isfinite(floats)
+        if not finite.any():
+            return values
+        
+        observed = floats[finite]
+        low, high = observed.min(), observed.max()
+        has_gaps = not finite.all()
+        integral = values.dtype.kind in 'iu' or bool(np.all(observed == np.round(observed)))
+        
+        limits = PARAM_LIMITS.get(name)
+        binary = low >= 0 and high <= 1
+        if binary and limits is not None and limits['max'] > 1:
+            integral = False
+        
+        if integral and not has_gaps:
+            if binary:
+                return values.astype(np.uint8)
+            for dtype in ((np.uint8, np.uint16, np.uint32) if low >= 0 else (np.int8, np.int16, np.int32)):
+                info = np.iinfo(dtype)
+                if info.min <= low and high <= info.max:
+                    return values.astype(dtype)
+            return values
+        
+        if values.dtype == np.float32:
+            return values
+        
+        peak = max(abs(low), abs(high))
+        float32_spacing = np.spacing(np.float32(peak)) if peak > 0 else 0.0
+        if float32_spacing < 0.5 * self._quantization_step(observed):
+            return floats.astype(np.float32)
+        return values
+    
+    def _quantization_step(self, observed: np.ndarray, max_decimals: int = 9) -> float:
+        """
+        Estimate the decimal resolution a channel was recorded with.
+        
+        Tests an evenly spaced sample against 0..max_decimals decimal places
+        and returns 10**-d for the smallest d that represents every value.
+        """
+        sample = observed[np.linspace(0, len(observed) - 1, min(len(observed), 2000)).astype(int)]
+        scales = 10.0 ** np.arange(max_decimals + 1)
+        scaled = np.abs(sample)[:, None] * scales[None, :]
+        # Within 0.1% of a quantum, plus the rounding noise of the text-to-float conversion
+        exact = np.abs(scaled - np.round(scaled)) <= 1e-3 + 4 * np.finfo(np.float64).eps * scaled
+        decimals = np.flatnonzero(exact.all(axis=0))
+        if len(decimals) == 0:
+            return 0.0
+        return 10.0 ** -decimals[0]
+    
     def get_parameter_categories(self, df: pd.DataFrame) -> Dict[str, List[str]]:
         """
         Categorize parameters based on common flight test naming conventions.
@@ -343,6 +1316,200 @@ class DataProcessor:
         
         return stats
     
+    def analyze_sampling(self, df: pd.DataFrame, parameters: Optional[List[str]] = None,
+                         time_column: str = 'Elapsed Time (s)') -> Dict[str, Any]:
+        """
+        Describe the sample-interval distribution of a recording.
+        
+        Args:
+            df: Processed flight DataFrame
+            parameters: Channels whose own update rate (rate of non-missing
+                samples) should be reported, e.g. channels from slower buses
+            time_column: Numeric time column
+            
+        Returns:
+            Dictionary with the median 'interval' (s) and 'rate' (Hz),
+            'min_interval', 'max_interval', 'p05'/'p95' interval percentiles,
+            'jitter' (interval std relative to the median), 'dropouts' (gaps
+            longer than 1.5 intervals), 'dropout_time' (s), 'uniform' and
+            'channel_rates' ({parameter: Hz})
+        """
+        time = df[time_column].to_numpy(dtype=np.float64, na_value=np.nan) if time_column in df.columns else np.array([])
+        time = time[np.isfinite(time)]
+        intervals = np.diff(time)
+        intervals = intervals[intervals > 0]
+        if len(intervals) == 0:
+            return {'interval': np.nan, 'rate': np.nan, 'min_interval': np.nan, 'max_interval': np.nan,
+                    'p05': np.nan, 'p95': np.nan, 'jitter': np.nan, 'dropouts': 0,
+                    'dropout_time': 0.0, 'uniform': False, 'channel_rates': {}}
+        
+        median = float(np.median(intervals))
+        p05, p95 = np.percentile(intervals, [5, 95])
+        gaps = intervals[intervals > 1.5 * median]
+        
+        channel_rates = {}
+        for param in parameters or []:
+            if param in df.columns and pd.api.types.is_numeric_dtype(df[param]):
+                values = df[param].to_numpy(dtype=np.float64, na_value=np.nan)
+                column_time = df[time_column].to_numpy(dtype=np.float64, na_value=np.nan)
+                updates = np.diff(column_time[np.isfinite(values) & np.isfinite(column_time)])
+                updates = updates[updates > 0]
+                channel_rates[param] = 1.0 / float(np.median(updates)) if len(updates) else np.nan
+        
+        return {
+            'interval': median,
+            'rate': 1.0 / median,
+            'min_interval': float(intervals.min()),
+            'max_interval': float(intervals.max()),
+            'p05': float(p05),
+            'p95': float(p95),
+            'jitter': float(intervals.std() / median),
+            'dropouts': int(len(gaps)),
+            'dropout_time': float((gaps - median).sum()),
+            # Timestamps quantized to the clock resolution still count as uniform
+            'uniform': len(gaps) == 0 and (p95 - p05) <= 0.01 * median,
+            'channel_rates': channel_rates
+        }
+    
+    def resample_uniform(self, df: pd.DataFrame, parameters: List[str], rate: Optional[float] = None,
+                         method: str = 'linear', time_column: str = 'Elapsed Time (s)',
+                         max_gap: Optional[float] = 4.0) -> pd.DataFrame:
+        """
+        Interpolate channels onto a uniform time grid.
+        
+        The grid starts at the first sample and steps by 1/rate, so every
+        caller asking for the same rate gets the same grid. Interpolation is
+        vectorized over all requested channels at once, and each resampled
+        channel is cached, so spectra, correlations and exports share it.
+        
+        Args:
+            df: Processed flight DataFrame
+            parameters: Numeric channels to resample
+            rate: Grid rate in Hz; defaults to the median sampling rate
+            method: 'linear', or 'previous' to hold the last sample (discrete
+                channels and sample-and-hold bus data)
+            time_column: Numeric time column
+            max_gap: Grid points inside a dropout longer than this many
+                nominal sample intervals are left missing rather than
+                interpolated or held (None bridges every gap). The nominal
+                interval is the median spacing of the time column, or of a
+                channel's own samples for channels with missing values.
+            
+        Returns:
+            DataFrame with the uniform time column, a matching 'Timestamp'
+            when the input has one, and the resampled channels; channels
+            with missing samples are interpolated between the samples they
+            have and are missing outside them and across long dropouts
+        """
+        time = df[time_column].to_numpy(dtype=np.float64, na_value=np.nan)
+        valid_rows = np.flatnonzero(np.isfinite(time))
+        if not np.all(np.diff(time[valid_rows]) >= 0):
+            valid_rows = valid_rows[np.argsort(time[valid_rows], kind='stable')]
+        time = time[valid_rows]
+        
+        if rate is None:
+            rate = self.analyze_sampling(df, time_column=time_column)['rate']
+        parameters = [param for param in dict.fromkeys(parameters) if param in df.columns
+                      and param != time_column and pd.api.types.is_numeric_dtype(df[param])]
+        if len(time) < 2 or not rate or not np.isfinite(rate) or rate <= 0:
+            return df.iloc[0:0][[time_column] + parameters]
+        
+        steps = int(np.floor((time[-1] - time[0]) * rate + 1e-9)) + 1
+        grid = time[0] + np.arange(steps) / rate
+        
+        keys = {param: (DataCache.frame_key(df, [time_column, param]), param, float(rate), method, max_gap)
+                for param in parameters}
+        # Hits are read first, so caching the misses cannot evict them
+        cached = {param: self._resample_cache.get(keys[param]) for param in parameters}
+        computed = {param: values for param, values in cached.items() if values is not None}
+        missing = [param for param in parameters if param not in computed]
+        if missing:
+            # Bracketing samples and weights are shared by every channel
+            right = np.clip(np.searchsorted(time, grid, side='right'), 1, len(time) - 1)
+            left = right - 1
+            span = time[right] - time[left]
+            with np.errstate(invalid='ignore', divide='ignore'):
+                weight = np.where(span > 0, (grid - time[left]) / span, 0.0)
+            if method == 'previous':
+                left = np.where(weight >= 1.0, right, left)
+            dropout = self._dropout_mask(time, grid, right, max_gap)
+            
+            columns = [df[param].to_numpy(dtype=np.float64, na_value=np.nan)[valid_rows] for param in missing]
+            complete = [j for j, values in enumerate(columns) if not np.isnan(values).any()]
+            if complete:
+                block = np.stack([columns[j] for j in complete])
+                if method == 'previous':
+                    resampled = block[:, left]
+                else:
+                    low = block[:, left]
+                    resampled = low + weight * (block[:, right] - low)
+                resampled[:, dropout] = np.nan
+                for j, values in zip(complete, resampled):
+                    computed[missing[j]] = self._cache_resampled(keys[missing[j]], values)
+            
+            # Slower-bus channels (NaN between updates) are interpolated between their own samples
+            for j, values in enumerate(columns):
+                if missing[j] in computed:
+                    continue
+                present = ~np.isnan(values)
+                resampled = np.full(steps, np.nan)
+                if present.any():
+                    own_time, own_values = time[present], values[present]
+                    if method == 'previous':
+                        idx = np.searchsorted(own_time, grid, side='right') - 1
+                        inside = idx >= 0
+                        resampled[inside] = own_values[idx[inside]]
+                    else:
+                        resampled = np.interp(grid, own_time, own_values, left=np.nan, right=np.nan)
+                    if len(own_time) > 1:
+                        own_right = np.clip(np.searchsorted(own_time, grid, side='right'), 1, len(own_time) - 1)
+                        resampled[self._dropout_mask(own_time, grid, own_right, max_gap)] = np.nan
+                computed[missing[j]] = self._cache_resampled(keys[missing[j]], resampled)
+        
+        columns = {}
+        if 'Timestamp' in df.columns and pd.api.types.is_datetime64_any_dtype(df['Timestamp']):
+            start = df['Timestamp'].iloc[valid_rows[0]].to_datetime64().astype('datetime64[ns]')
+            columns['Timestamp'] = start + np.round((grid - time[0]) * 1e9).astype('timedelta64[ns]')
+        columns[time_column] = grid
+        for param in parameters:
+            columns[param] = computed[param]
+        
+        result = pd.DataFrame(columns)
+        result.attrs['source_key'] = f"{df.attrs.get('source_key')}@{rate:.9g}Hz/{method}"
+        result.attrs['sampling'] = {'rate': float(rate), 'method': method}
+        return result
+    
+    @staticmethod
+    def _dropout_mask(time: np.ndarray, grid: np.ndarray, right: np.ndarray,
+                      max_gap: Optional[float]) -> np.ndarray:
+        """
+        Flag grid points that fall strictly inside a dropout.
+        
+        Args:
+            time: Sorted sample times
+            grid: Uniform grid times
+            right: Index of the first sample after each grid point, clipped
+                to 1..len(time)-1
+            max_gap: Dropout length in median sample intervals (None for no limit)
+        """
+        if max_gap is None:
+            return np.zeros(len(grid), dtype=bool)
+        span = time[right] - time[right - 1]
+        interval = np.median(np.diff(time))
+        return (span > max_gap * interval) & (grid > time[right - 1]) & (grid < time[right])
+    
+    def _cache_resampled(self, key: Tuple, values: np.ndarray) -> np.ndarray:
+        """
+        Store one resampled channel, read-only since callers share it.
+        
+        Returns:
+            The (read-only) array, also when it alone exceeds the cache budget
+        """
+        values = np.ascontiguousarray(values)
+        values.flags.writeable = False
+        self._resample_cache.put(key, values, values.nbytes)
+        return values
+    
     def export_processed_data(self, df: pd.DataFrame, format: str = 'csv') -> str:
         """
         Export processed data in various formats.
@@ -366,3 +1533,223 @@ class DataProcessor:
         else:
             return df.to_csv(index=False)
 
+
+
+class ColumnStore:
+    """
+    Columnar container for flight data assembled from streamed chunks.
+    
+    Each column is kept as a list of NumPy chunk arrays until finalize()
+    joins them, so appending never copies previously ingested rows.
+    """
+    
+    def __init__(self, columns: List[str]):
+        self.columns = list(columns)
+        self.metadata: Dict[str, Any] = {}
+        self._chunks: List[List[np.ndarray]] = [[] for _ in self.columns]
+        self._arrays: Optional[List[np.ndarray]] = None
+        self._length = 0
+    
+    def append(self, df: pd.DataFrame):
+        """Append a processed chunk whose columns match the store."""
+        if self._arrays is not None:
+            raise RuntimeError("Cannot append to a finalized ColumnStore")
+        for idx in range(len(self.columns)):
+            self._chunks[idx].append(df.iloc[:, idx].to_numpy())
+        self._length += len(df)
+    
+    @classmethod
+    def from_dataframe(cls, df: pd.DataFrame) -> 'ColumnStore':
+        """Wrap the columns of an existing DataFrame in a finalized store."""
+        store = cls(list(df.columns))
+        store._arrays = [df.iloc[:, idx].to_numpy() for idx in range(len(df.columns))]
+        store._length = len(df)
+        return store
+    
+    def finalize(self) -> 'ColumnStore':
+        """Join the chunks of every column, releasing them one column at a time."""
+        if self._arrays is None:
+            arrays = []
+            for idx in range(len(self.columns)):
+                chunks = self._chunks[idx]
+                arrays.append(np.concatenate(chunks) if chunks else np.empty(0))
+                self._chunks[idx] = []
+            self._arrays = arrays
+        return self
+    
+    def drop_columns(self, columns: List[str]):
+        """Remove columns from a finalized store."""
+        keep = [idx for idx, col in enumerate(self.columns) if col not in columns]
+        self.columns = [self.columns[idx] for idx in keep]
+        self._arrays = [self._arrays[idx] for idx in keep]
+    
+    def replace_column(self, column: str, values: np.ndarray):
+        """Swap the array of a finalized column, e.g. for a dtype conversion."""
+        self.finalize()
+        self._arrays[self.columns.index(column)] = values
+    
+    @property
+    def nbytes(self) -> int:
+        """Approximate resident size of the stored arrays."""
+        arrays = self._arrays if self._arrays is not None else [a for c in self._chunks for a in c]
+        return int(sum(a.nbytes for a in arrays))
+    
+    def __len__(self) -> int:
+        return self._length
+    
+    def __contains__(self, column: str) -> bool:
+        return column in self.columns
+    
+    def __getitem__(self, column: str) -> np.ndarray:
+        self.finalize()
+        return self._arrays[self.columns.index(column)]
+    
+    def to_dataframe(self) -> pd.DataFrame:
+        """
+        Expose the store as a DataFrame without copying the column arrays.
+        """
+        self.finalize()
+        df = pd.DataFrame({idx: array for idx, array in enumerate(self._arrays)}, copy=False)
+        df.columns = self.columns
+        return df
+
+
+class ColumnProjection:
+    """
+    Column-projected view of a flight file.
+    
+    The catalog comes from the two header rows alone. Channels are parsed
+    from the upload only when a dashboard asks for them, together with
+    Timestamp and Elapsed Time on the first request, and kept for later
+    requests, so memory scales with the channels in use rather than the
+    channels recorded.
+    """
+    
+    def __init__(self, processor: DataProcessor, file, columns: List[str], body_start: int):
+        """
+        Args:
+            processor: DataProcessor whose parsing and conversion rules apply
+            file: Seekable binary stream holding the flight file
+            columns: Column names built from the header rows
+            body_start: Byte offset of the first data row
+        """
+        self.processor = processor
+        self.file = file
+        self.columns = columns
+        self.body_start = body_start
+        # First occurrence wins when a recorder repeats a parameter name
+        self._index: Dict[str, int] = {}
+        for idx, col in enumerate(columns):
+            self._index.setdefault(col, idx)
+        self._time: Optional[pd.DataFrame] = None  # Timestamp and Elapsed Time
+        self._valid_rows: Optional[np.ndarray] = None  # Rows kept after timestamp parsing
+        self._loaded: Dict[str, pd.Series] = {}
+    
+    @property
+    def catalog(self) -> List[str]:
+        """Parameter names available in the file, excluding the time columns."""
+        return [col for col in self._index if col not in self.processor.required_columns]
+    
+    @property
+    def loaded_columns(self) -> List[str]:
+        """Parameters materialized so far."""
+        return list(self._loaded)
+    
+    @property
+    def nbytes(self) -> int:
+        """Approximate resident size of the materialized columns."""
+        frames = [self._time] if self._time is not None else []
+        return int(sum(frame.memory_usage(index=False).sum() for frame in frames) +
+                   sum(series.memory_usage(index=False) for series in self._loaded.values()))
+    
+    def load(self, parameters: List[str]) -> pd.DataFrame:
+        """
+        Return a DataFrame with Timestamp, the requested parameters and Elapsed Time.
+        
+        Parameters not loaded yet are parsed from the file in a single pass;
+        unknown names are ignored.
+        
+        Args:
+            parameters: Parameter names from the catalog
+            
+        Returns:
+            DataFrame of the requested columns, or empty DataFrame if loading fails
+        """
+        wanted = [p for p in dict.fromkeys(parameters) if p in self._index and p != 'Timestamp']
+        missing = [p for p in wanted if p not in self._loaded]
+        if self._time is None or missing:
+            try:
+                self._materialize(missing)
+            except Exception as e:
+                self.processor._notify('error', f"Error loading data: {e}")
+                return pd.DataFrame()
+        
+        if self._time is None:
+            return pd.DataFrame()
+        
+        data = {'Timestamp': self._time['Timestamp']}
+        data.update({p: self._loaded[p] for p in wanted})
+        data['Elapsed Time (s)'] = self._time['Elapsed Time (s)']
+        return pd.DataFrame(data, copy=False)
+    
+    def _materialize(self, parameters: List[str]):
+        """
+        Parse the given parameters (and the timestamps on first use) from the file.
+        """
+        processor = self.processor
+        indices = sorted({self._index[p] for p in parameters} | ({0} if self._time is None else set()))
+        
+        self.file.seek(self.body_start)
+        frame = pd.read_csv(
+            self.file,
+            header=None,
+            names=list(range(len(self.columns))),
+            usecols=indices,
+            dtype={0: str},
+            engine='c',
+            encoding='utf-8',
+            quoting=csv.QUOTE_NONE,
+            skipinitialspace=True,
+            keep_default_na=False,
+            na_values=[''],
+            low_memory=False
+        )
+        
+        if self._time is None:
+            raw_timestamps = frame.pop(0)
+            timestamp_format = processor._detect_timestamp_format(raw_timestamps)
+            parsed = processor._parse_timestamps(raw_timestamps, timestamp_format)
+            if parsed is None or parsed.notna().sum() == 0:
+                processor._notify('error', "Could not parse timestamps. Expected formats: day:hour:minute:second.millisecond or standard datetime")
+                return
+            
+            processor.timestamp_format = timestamp_format
+            valid = parsed.notna().to_numpy()
+            if not valid.all():
+                processor._notify('warning', f"Removed {int((~valid).sum())} rows with invalid timestamps")
+                self._valid_rows = valid
+                parsed = parsed[valid].reset_index(drop=True)
+            
+            self._time = processor._calculate_derived_columns(pd.DataFrame({'Timestamp': parsed}))
+        
+        if not parameters:
+            return
+        
+        if self._valid_rows is not None:
+            frame = frame[self._valid_rows].reset_index(drop=True)
+        frame = frame[[self._index[p] for p in parameters]]
+        frame.columns = parameters
+        
+        for col in parameters:
+            if not pd.api.types.is_numeric_dtype(frame[col]):
+                frame[col] = processor._arrow_text(frame[col]).fillna('').str.strip()
+        frame = processor._convert_numeric_columns(frame)
+        
+        for col in parameters:
+            series = frame[col]
+            if processor.compact_dtypes:
+                values = series.to_numpy()
+                compact = processor._compact_array(col, values)
+                if compact is not values:
+                    series = pd.Series(compact, name=col)
+            self._loaded[col] = series
@@ -0,0 +1,150 @@
+import numpy as np
+import pandas as pd
+from typing import Dict, Any
+
+from components.data_cache import DataCache, LRUCache
+
+
+class DataProfiler:
+    """
+    Single-pass data-quality profile of a flight DataFrame.
+
+    Numeric channels are stacked into float64 column blocks and null
+    counts, distinct counts, min, max, mean and standard deviation are
+    computed for a whole block at once instead of column by column.
+    Profiles are cached per dataset (see DataCache.frame_key), so the Data
+    Quality tab and the exported report read the same pass and reruns do
+    not repeat it.
+    """
+
+    _cache = LRUCache(max_entries=8)
+
+    def __init__(self, max_entries: int = 8, block_columns: int = 128,
+                 low_cardinality_ratio: float = 0.01):
+        """
+        Args:
+            max_entries: Number of dataset profiles kept in the cache
+            block_columns: Numeric columns stacked per vectorized block
+            low_cardinality_ratio: Distinct values below this fraction of
+                the rows flag a channel as low-cardinality
+        """
+        DataProfiler._cache.max_entries = max_entries
+        self.block_columns = block_columns
+        self.low_cardinality_ratio = low_cardinality_ratio
+
+    def profile(self, df: pd.DataFrame) -> Dict[str, Any]:
+        """
+        Profile every column of a DataFrame, reusing a cached result when possible.
+
+        Args:
+            df: Flight DataFrame
+
+        Returns:
+            Dictionary with 'rows', 'duplicate_timestamps' and 'columns', a
+            DataFrame indexed by column name with dtype, numeric, nulls,
+            null_pct, unique, constant, low_cardinality, min, max, mean and
+            std (statistics are NaN for non-numeric columns)
+        """
+        key = DataCache.frame_key(df)
+        cached = self._cache.get(key)
+        if cached is not None:
+            return cached
+
+        result = self._compute_profile(df)
+        self._cache.put(key, result)
+        return result
+
+    def _compute_profile(self, df: pd.DataFrame) -> Dict[str, Any]:
+        """
+        Compute the profile of a DataFrame without consulting the cache.
+        """
+        rows = len(df)
+        width = len(df.columns)
+        numeric = np.array([pd.api.types.is_numeric_dtype(df.iloc[:, idx]) and
+                            not pd.api.types.is_bool_dtype(df.iloc[:, idx])
+                            for idx in range(width)], dtype=bool)
+
+        nulls = np.zeros(width, dtype=np.int64)
+        stats = {name: np.full(width, np.nan) for name in ('unique', 'min', 'max', 'mean', 'std')}
+
+        numeric_idx = np.flatnonzero(numeric)
+        for start in range(0, len(numeric_idx), self.block_columns):
+            block_idx = numeric_idx[start:start + self.block_columns]
+            block = np.empty((rows, len(block_idx)), dtype=np.float64, order='F')
+            for j, idx in enumerate(block_idx):
+                block[:, j] = df.iloc[:, idx].to_numpy(dtype=np.float64, na_value=np.nan)
+
+            block_stats = self._profile_block(block)
+            nulls[block_idx] = block_stats.pop('nulls')
+            for name, values in block_stats.items():
+                stats[name][block_idx] = values
+
+        # Text and datetime columns only need their null counts
+        for idx in np.flatnonzero(~numeric):
+            nulls[idx] = int(df.iloc[:, idx].isna().sum())
+
+        unique = stats['unique']
+        constant = unique == 1
+        low_cardinality = (~constant & (nulls < rows) &
+                           (unique < rows * self.low_cardinality_ratio))
+
+        columns = pd.DataFrame({
+            'dtype': [str(dtype) for dtype in df.dtypes],
+            'numeric': numeric,
+            'nulls': nulls,
+            'null_pct': nulls / rows * 100 if rows else np.zeros(width),
+            'unique': unique,
+            'constant': constant,
+            'low_cardinality': low_cardinality,
+            'min': stats['min'],
+            'max': stats['max'],
+            'mean': stats['mean'],
+            'std': stats['std']
+        }, index=pd.Index(df.columns, name='Parameter'))
+
+        return {
+            'rows': rows,
+            'duplicate_timestamps': self._count_duplicate_timestamps(df),
+            'columns': columns
+        }
+
+    def _profile_block(self, block: np.ndarray) -> Dict[str, np.ndarray]:
+        """
+        Compute per-column statistics for a (rows x columns) float64 block.
+
+        Follows pandas conventions: NaNs are skipped, std uses ddof=1 and
+        is NaN for fewer than two values, and the distinct count ignores NaN.
+        """
+        missing = np.isnan(block)
+        nulls = missing.sum(axis=0)
+        counts = block.shape[0] - nulls
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = np.where(missing, 0.0, block).sum(axis=0) / counts
+            centered = np.where(missing, 0.0, block - mean)
+            variance = np.square(centered).sum(axis=0) / (counts - 1)
+        std = np.where(counts > 1, np.sqrt(np.maximum(variance, 0.0)), np.nan)
+        mean = np.where(counts > 0, mean, np.nan)
+
+        # fmin/fmax skip NaN and return NaN only for all-NaN columns
+        low = np.fmin.reduce(block, axis=0) if len(block) else np.full(block.shape[1], np.nan)
+        high = np.fmax.reduce(block, axis=0) if len(block) else np.full(block.shape[1], np.nan)
+
+        # Distinct values: sort each column (NaN sorts last) and count value changes
+        ordered = np.sort(block, axis=0)
+        changes = (ordered[1:] != ordered[:-1]) & ~np.isnan(ordered[1:])
+        unique = (counts > 0).astype(np.int64) + changes.sum(axis=0)
+
+        return {'nulls': nulls, 'unique': unique, 'min': low, 'max': high,
+                'mean': mean, 'std': std}
+
+    def _count_duplicate_timestamps(self, df: pd.DataFrame) -> int:
+        """Number of rows whose timestamp repeats an earlier one."""
+        if 'Timestamp' not in df.columns or not len(df):
+            return 0
+        timestamps = df['Timestamp']
+        if isinstance(timestamps, pd.DataFrame):
+            timestamps = timestamps.iloc[:, 0]
+        if not pd.api.types.is_datetime64_any_dtype(timestamps):
+            return int(timestamps.duplicated().sum())
+        return len(timestamps) - len(np.unique(timestamps.to_numpy()))
@@ -0,0 +1,259 @@
+"""
+Point-budget decimation for time-history traces.
+
+Both methods return indices into the original arrays, so callers can take
+the matching x values (elapsed seconds or timestamps) and hover data from
+the full-resolution series.
+
+- ``lttb``: Largest-Triangle-Three-Buckets, which keeps the points that
+  preserve the visual shape of the trace. Long series are first reduced
+  with per-bucket min/max (MinMaxLTTB), so the cost stays proportional to
+  the point budget rather than the flight length.
+- ``minmax``: the minimum and maximum of every bucket, which guarantees
+  that every peak and spike survives, e.g. for limit exceedance checks.
+
+Bar charts use ``bin_aggregates`` instead, which summarizes every bucket
+by its mean, minimum, maximum and RMS, and dense scatter plots use
+``density_grid``, which counts the samples falling in every cell of a
+screen-sized 2-D grid.
+"""
+
+import numpy as np
+from typing import Dict, Tuple
+
+DECIMATION_METHODS = ['lttb', 'minmax', 'none']
+BAR_AGGREGATIONS = ['mean', 'min', 'max', 'rms']
+
+# LTTB runs on min/max-preselected points once a series exceeds this many
+# points per output point
+LTTB_PRESELECT_RATIO = 4
+
+
+def decimate(x: np.ndarray, y: np.ndarray, max_points: int, method: str = 'lttb') -> np.ndarray:
+    """
+    Choose at most about ``max_points`` indices of a trace to display.
+
+    Samples where x or y is missing are never selected, but missing runs
+    wider than one bucket keep their first sample so the plot still shows
+    the data gap instead of bridging it with a straight line.
+
+    Args:
+        x: X values (numeric or datetime64), sorted in display order
+        y: Numeric y values
+        max_points: Point budget for the trace
+        method: 'lttb', 'minmax' or 'none'
+
+    Returns:
+        Sorted array of selected indices
+    """
+    n = len(y)
+    if method == 'none' or n <= max_points or max_points < 3:
+        return np.arange(n)
+
+    x_values, y_values, valid = _as_float(x, y)
+    valid_idx = np.flatnonzero(valid)
+    if len(valid_idx) > max_points:
+        if method == 'minmax':
+            selected = minmax_indices(y_values[valid_idx], max_points)
+        else:
+            selected = lttb_indices(x_values[valid_idx], y_values[valid_idx], max_points)
+        selected = valid_idx[selected]
+    else:
+        selected = valid_idx
+
+    # Keep one sample per visible gap so the line breaks there
+    if len(valid_idx) < n:
+        edges = np.diff(np.concatenate(([0], (~valid).view(np.int8), [0])))
+        starts = np.flatnonzero(edges == 1)
+        ends = np.flatnonzero(edges == -1)
+        wide = (ends - starts) >= max(1, n // max_points)
+        selected = np.union1d(selected, starts[wide])
+
+    return selected
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets point selection.
+
+    The first and last points are always kept; each of the ``n_out - 2``
+    buckets in between contributes the point that forms the largest
+    triangle with the previously selected point and the next bucket's mean.
+
+    Args:
+        x: Finite x values, sorted
+        y: Finite y values
+        n_out: Number of points to keep
+
+    Returns:
+        Sorted array of ``n_out`` indices
+    """
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    if n > n_out * LTTB_PRESELECT_RATIO:
+        candidates = minmax_indices(y, n_out * LTTB_PRESELECT_RATIO)
+        return candidates[lttb_indices(x[candidates], y[candidates], n_out)]
+
+    # Bucket boundaries over the interior points 1 .. n-2
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    counts = np.diff(edges)
+    mean_x = np.add.reduceat(x[:-1], edges[:-1]) / counts
+    mean_y = np.add.reduceat(y[:-1], edges[:-1]) / counts
+
+    # Buckets hold only a few points here (longer series were preselected),
+    # so plain floats beat per-bucket NumPy calls
+    xs, ys = x.tolist(), y.tolist()
+    mean_x, mean_y, bounds = mean_x.tolist(), mean_y.tolist(), edges.tolist()
+
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+    a = 0
+    for i in range(n_out - 2):
+        if i < n_out - 3:
+            cx, cy = mean_x[i + 1], mean_y[i + 1]
+        else:
+            cx, cy = xs[-1], ys[-1]
+        xa, ya = xs[a], ys[a]
+        dx, dy = xa - cx, cy - ya
+        # Twice the triangle area; the constant factor does not change the argmax
+        best = -1.0
+        for j in range(bounds[i], bounds[i + 1]):
+            area = abs(dx * (ys[j] - ya) - (xa - xs[j]) * dy)
+            if area > best:
+                best, a = area, j
+        selected[i + 1] = a
+
+    return selected
+
+
+def minmax_indices(y: np.ndarray, n_out: int) -> np.ndarray:
+    """
+    Per-bucket minimum and maximum point selection.
+
+    The series is split into ``n_out // 2`` equal buckets and the indices of
+    each bucket's minimum and maximum are kept, along with the first and
+    last points, so no extreme value is ever dropped.
+
+    Args:
+        y: Finite y values
+        n_out: Point budget
+
+    Returns:
+        Sorted array of at most ``n_out + 2`` unique indices
+    """
+    n = len(y)
+    if n <= n_out:
+        return np.arange(n)
+
+    buckets = max(1, n_out // 2)
+    size = -(-n // buckets)
+    buckets = -(-n // size)
+    offsets = np.arange(buckets) * size
+
+    # Pad the tail bucket with values that can never win
+    padded = np.full(buckets * size, np.inf)
+    padded[:n] = y
+    lowest = padded.reshape(buckets, size).argmin(axis=1) + offsets
+    padded[n:] = -np.inf
+    highest = padded.reshape(buckets, size).argmax(axis=1) + offsets
+
+    return np.unique(np.concatenate(([0, n - 1], lowest, highest)))
+
+
+def bin_aggregates(y: np.ndarray, bins: int) -> Dict[str, np.ndarray]:
+    """
+    Summarize a series in at most ``bins`` equal buckets of consecutive samples.
+
+    The series is padded to a whole number of buckets and reshaped to
+    (buckets x samples per bucket), so every aggregate is a single reduce
+    along the bucket axis. Missing samples are ignored; buckets without
+    any valid sample are NaN.
+
+    Args:
+        y: Numeric y values
+        bins: Maximum number of buckets
+
+    Returns:
+        Dictionary with 'start' (first index of every bucket), 'size'
+        (samples per bucket) and one array per BAR_AGGREGATIONS entry
+    """
+    n = len(y)
+    size = max(1, -(-n // max(1, bins)))
+    buckets = -(-n // size)
+    padded = np.full(buckets * size, np.nan)
+    padded[:n] = y
+    block = padded.reshape(buckets, size)
+
+    present = ~np.isnan(block)
+    filled = np.where(present, block, 0.0)
+    count = present.sum(axis=1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = filled.sum(axis=1) / count
+        rms = np.sqrt(np.square(filled).sum(axis=1) / count)
+    return {
+        'start': np.arange(buckets) * size,
+        'size': size,
+        'mean': mean,
+        'min': np.fmin.reduce(block, axis=1),
+        'max': np.fmax.reduce(block, axis=1),
+        'rms': rms
+    }
+
+
+def density_grid(x: np.ndarray, y: np.ndarray, x_bins: int = 500, y_bins: int = 300) -> Dict[str, np.ndarray]:
+    """
+    Count (x, y) pairs in a regular 2-D grid spanning their range.
+
+    Cell indices are computed arithmetically and counted with a single
+    bincount, which is much faster than np.histogram2d's bin search and
+    handles millions of samples in milliseconds. Pairs with a missing
+    value are ignored.
+
+    Args:
+        x: X values (numeric or datetime64)
+        y: Numeric y values
+        x_bins, y_bins: Grid resolution
+
+    Returns:
+        Dictionary with the cell centres 'x' (datetime64 for datetime x)
+        and 'y', and 'counts' of shape (y_bins x x_bins); empty arrays
+        when no pair is complete
+    """
+    x_values, y_values, valid = _as_float(x, y)
+    x_values, y_values = x_values[valid], y_values[valid]
+    if len(x_values) == 0:
+        return {'x': np.array([]), 'y': np.array([]), 'counts': np.zeros((0, 0), dtype=np.int64)}
+
+    edges = []
+    cells = []
+    for values, bins in ((x_values, x_bins), (y_values, y_bins)):
+        low, high = values.min(), values.max()
+        width = (high - low) / bins if high > low else 1.0
+        cells.append(np.minimum(((values - low) / width).astype(np.intp), bins - 1))
+        edges.append(low + (np.arange(bins) + 0.5) * width)
+
+    counts = np.bincount(cells[1] * x_bins + cells[0], minlength=x_bins * y_bins).reshape(y_bins, x_bins)
+    x_centres = edges[0]
+    if np.asarray(x).dtype.kind == 'M':
+        x_centres = x_centres.astype(np.int64).astype('datetime64[ns]')
+    return {'x': x_centres, 'y': edges[1], 'counts': counts}
+
+
+def _as_float(x: np.ndarray, y: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Convert x and y to float64 and flag the samples where both are present.
+    """
+    x = np.asarray(x)
+    if x.dtype.kind == 'M':
+        valid = ~np.isnat(x)
+        x_values = x.astype('datetime64[ns]').view(np.int64).astype(np.float64)
+    else:
+        x_values = x.astype(np.float64, copy=False)
+        valid = np.isfinite(x_values)
+
+    y_values = np.asarray(y, dtype=np.float64)
+    valid &= np.isfinite(y_values)
+    return x_values, y_values, valid
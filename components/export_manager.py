@@ -9,6 +9,8 @@ from typing import Dict, List, Any, Optional
 import io
 
 from components.chart_manager import ChartManager
+from components.data_processor import DataProcessor
+from components.data_profiler import DataProfiler
 from components.flight_param_limits import PARAM_LIMITS
 
 
@@ -28,20 +30,22 @@ class ExportManager:
             'excel': 'Excel Workbook'
         }
     
-    def export_dashboard_html(self, charts: Dict[str, Dict[str, Any]], df: pd.DataFrame) -> str:
+    def export_dashboard_html(self, charts: Dict[str, Dict[str, Any]], df: pd.DataFrame,
+                              chart_manager: Optional[ChartManager] = None) -> str:
         """
         Export the entire dashboard as an interactive HTML file.
         
         Args:
             charts: Dictionary of chart configurations
             df: DataFrame containing the flight data
+            chart_manager: Chart manager of the dashboard, so figures already
+                drawn are taken from its cache instead of being rebuilt
             
         Returns:
             HTML content as string
         """
         try:
-            from components.chart_manager import ChartManager
-            chart_manager = ChartManager()
+            chart_manager = chart_manager or ChartManager()
             
             # Generate HTML content
             html_content = self._generate_html_template()
@@ -98,7 +102,8 @@ class ExportManager:
             interpretations.append("Nenhum parâmetro crítico identificado com valores fora dos limites default.")
         return interpretations
 
-    def generate_auto_report(self, charts, df, stats=None, info=None, filename="report.html"):
+    def generate_auto_report(self, charts, df, stats=None, info=None, filename="report.html",
+                             chart_manager=None):
         if isinstance(charts, str):
             raise ValueError("Charts is a string, expected a dictionary of chart configs.")
         if not isinstance(df, pd.DataFrame):
@@ -118,8 +123,8 @@ class ExportManager:
         
         # 3. Gráficos principais
         html_parts.append("<h2>Gráficos</h2>")
+        chart_manager = chart_manager or ChartManager()
         for config in charts.values():
-            chart_manager = ChartManager()
             fig = chart_manager.create_chart(df, config)
             if fig:
                 fig_html = pio.to_html(fig, full_html=False, include_plotlyjs='cdn')
@@ -286,13 +291,16 @@ class ExportManager:
             st.error(f"Error exporting chart image: {e}")
             return b""
     
-    def export_data_csv(self, df: pd.DataFrame, include_metadata: bool = True) -> str:
+    def export_data_csv(self, df: pd.DataFrame, include_metadata: bool = True,
+                        resample_rate: Optional[float] = None) -> str:
         """
         Export data as CSV with optional metadata.
         
         Args:
             df: DataFrame to export
             include_metadata: Whether to include metadata header
+            resample_rate: Optional rate (Hz) of a uniform time grid the
+                numeric parameters are interpolated onto before export
             
         Returns:
             CSV content as string
@@ -300,6 +308,11 @@ class ExportManager:
         try:
             output = io.StringIO()
             
+            if resample_rate:
+                numeric = [col for col in df.columns if col not in ('Timestamp', 'Elapsed Time (s)')
+                           and pd.api.types.is_numeric_dtype(df[col])]
+                df = DataProcessor().resample_uniform(df, numeric, resample_rate)
+            
             if include_metadata:
                 # Add metadata header
                 output.write(f"# Flight Data Export\n")
@@ -307,6 +320,8 @@ class ExportManager:
                 output.write(f"# Data Points: {len(df)}\n")
                 output.write(f"# Parameters: {len(df.columns)}\n")
                 output.write(f"# Duration: {df['Elapsed Time (s)'].max():.2f} seconds\n")
+                if resample_rate:
+                    output.write(f"# Resampled: {resample_rate:g} Hz uniform grid (linear interpolation)\n")
                 output.write("#\n")
             
             # Export data
@@ -423,19 +438,19 @@ class ExportManager:
             HTML report content
         """
         try:
-            # Calculate summary statistics
-            numeric_cols = df.select_dtypes(include=['number']).columns
+            # Calculate summary statistics (shares the app's cached profile)
+            profile = DataProfiler().profile(df)['columns']
+            numeric_profile = profile[profile['numeric'] & (profile.index != 'Elapsed Time (s)')]
             summary_stats = {}
             
-            for col in numeric_cols:
-                if col not in ['Elapsed Time (s)']:
-                    summary_stats[col] = {
-                        'mean': df[col].mean(),
-                        'std': df[col].std(),
-                        'min': df[col].min(),
-                        'max': df[col].max(),
-                        'range': df[col].max() - df[col].min()
-                    }
+            for col, stats in numeric_profile.iterrows():
+                summary_stats[col] = {
+                    'mean': stats['mean'],
+                    'std': stats['std'],
+                    'min': stats['min'],
+                    'max': stats['max'],
+                    'range': stats['max'] - stats['min']
+                }
             
             # Generate report HTML
             report_html = f"""
@@ -528,17 +543,14 @@ class ExportManager:
             """
             
             # Data quality checks
-            missing_data = df.isnull().sum()
+            missing_data = profile['nulls']
             if missing_data.sum() > 0:
                 report_html += f"<li>Missing values detected in {missing_data[missing_data > 0].count()} parameters</li>"
             else:
                 report_html += "<li>No missing values detected</li>"
             
             # Check for constant values
-            constant_params = []
-            for col in numeric_cols:
-                if col not in ['Elapsed Time (s)'] and df[col].nunique() == 1:
-                    constant_params.append(col)
+            constant_params = numeric_profile.index[numeric_profile['constant']].tolist()
             
             if constant_params:
                 report_html += f"<li>Constant values detected in: {', '.join(constant_params)}</li>"
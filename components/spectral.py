@@ -0,0 +1,491 @@
+import warnings
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Any, Optional, Tuple
+from scipy import fft as sp_fft
+from scipy.signal import get_window, welch, detrend as remove_trend
+
+from components.data_cache import DataCache, LRUCache
+
+SPECTRAL_WINDOWS = ['hann', 'hamming', 'blackman', 'flattop', 'boxcar']
+DETREND_TYPES = ['constant', 'linear', 'none']
+NAN_POLICIES = ['interpolate', 'mean']
+PSD_AVERAGING = ['mean', 'median']
+
+
+class SpectralEngine:
+    """
+    Batched spectral analysis of flight channels.
+
+    The requested channels are stacked into one (channels x samples) array
+    and transformed with a single real FFT along the time axis, zero-padded
+    to a fast FFT length. Spectra are cached per dataset, channel and
+    settings, so a chart only transforms the channels it has not shown yet.
+    """
+
+    _cache = LRUCache(max_entries=64)
+
+    def __init__(self, max_entries: int = 64, block_channels: int = 16,
+                 time_column: str = 'Elapsed Time (s)'):
+        """
+        Args:
+            max_entries: Number of channel spectra kept in the cache
+            block_channels: Channels transformed per batched FFT, which bounds
+                the size of the intermediate arrays
+            time_column: Numeric time column that defines the sample interval
+        """
+        SpectralEngine._cache.max_entries = max_entries
+        self.block_channels = block_channels
+        self.time_column = time_column
+
+    def amplitude_spectrum(self, df: pd.DataFrame, parameters: List[str], window: str = 'hann',
+                           detrend: str = 'constant',
+                           nan_policy: str = 'interpolate') -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+        """
+        Single-sided amplitude spectra of several channels.
+
+        Amplitudes are corrected for the window's coherent gain, so a sine
+        of amplitude A shows a peak of about A whatever the window.
+
+        Args:
+            df: Flight DataFrame with the time column
+            parameters: Numeric channels to transform
+            window: One of SPECTRAL_WINDOWS
+            detrend: One of DETREND_TYPES, removed before windowing
+            nan_policy: One of NAN_POLICIES; 'interpolate' fills gaps
+                linearly between neighbouring samples, 'mean' with the
+                channel mean
+
+        Returns:
+            Tuple of (frequencies in Hz, {parameter: amplitudes}); channels
+            without valid samples get NaN amplitudes
+        """
+        return self._cached(df, parameters, detrend, nan_policy, ('amplitude', window),
+                            lambda block, dt: self._amplitude_block(block, dt, window))
+
+    def power_spectral_density(self, df: pd.DataFrame, parameters: List[str], nperseg: int = 256,
+                               overlap: float = 0.5, window: str = 'hann', average: str = 'mean',
+                               detrend: str = 'constant',
+                               nan_policy: str = 'interpolate') -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+        """
+        Welch power spectral densities of several channels.
+
+        Args:
+            df: Flight DataFrame with the time column
+            parameters: Numeric channels to analyse
+            nperseg: Samples per segment (capped at the record length)
+            overlap: Fraction of a segment shared with the next one, in [0, 1)
+            window: One of SPECTRAL_WINDOWS
+            average: One of PSD_AVERAGING; 'median' is robust to transients
+                that only affect a few segments
+            detrend: One of DETREND_TYPES, removed from every segment
+            nan_policy: One of NAN_POLICIES, see amplitude_spectrum
+
+        Returns:
+            Tuple of (frequencies in Hz, {parameter: PSD in units**2/Hz})
+        """
+        nperseg = max(2, min(int(nperseg), len(df)))
+        noverlap = min(int(nperseg * overlap), nperseg - 1)
+        settings = ('psd', nperseg, noverlap, window, average, detrend)
+        return self._cached(df, parameters, 'none', nan_policy, settings,
+                            lambda block, dt: self._psd_block(block, dt, nperseg, noverlap,
+                                                              window, average, detrend))
+
+    def spectrogram(self, df: pd.DataFrame, param: str, nperseg: int = 256, overlap: float = 0.5,
+                    window: str = 'hann', detrend: str = 'constant', nan_policy: str = 'interpolate',
+                    time_bins: int = 1000, freq_bins: int = 300) -> Dict[str, np.ndarray]:
+        """
+        Short-time Fourier power of one channel, reduced to a display-sized image.
+
+        Consecutive segments are averaged into at most ``time_bins`` columns
+        (a Welch average per column) and neighbouring frequencies into at
+        most ``freq_bins`` rows, chunk by chunk, so the full-resolution STFT
+        of a long recording is never held in memory.
+
+        Args:
+            df: Flight DataFrame with the time column
+            param: Numeric channel
+            nperseg, overlap, window, detrend, nan_policy: See power_spectral_density
+            time_bins: Maximum number of image columns
+            freq_bins: Maximum number of image rows
+
+        Returns:
+            Dictionary with 'time' (bin centres in the time column's units),
+            'frequency' (Hz) and 'power_db' (freq x time, dB re 1 unit**2/Hz)
+        """
+        nperseg = max(2, min(int(nperseg), len(df)))
+        hop = max(1, nperseg - min(int(nperseg * overlap), nperseg - 1))
+        settings = ('spectrogram', nperseg, hop, window, detrend, time_bins, freq_bins)
+        _, images = self._cached(df, [param], 'none', nan_policy, settings,
+                                 lambda block, dt: self._spectrogram_block(
+                                     block, dt, nperseg, hop, window, detrend, time_bins, freq_bins,
+                                     self._start_time(df)))
+        return images[param]
+
+    def lomb_scargle(self, df: pd.DataFrame, parameters: List[str], max_frequencies: int = 2048,
+                     oversampling: int = 4,
+                     grid_budget: int = 50_000_000) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+        """
+        Lomb-Scargle amplitude spectra of channels with irregular or missing samples.
+
+        Every channel is fitted at its own valid timestamps, so dropouts and
+        event-driven updates neither need filling nor smear the spectrum.
+        The grid runs up to half the median sample rate with at most
+        ``max_frequencies`` points, and at most ``grid_budget`` frequency x
+        sample evaluations, which keeps long recordings interactive. When
+        the record is longer than that grid resolves, it is split into
+        segments whose periodograms are averaged (as Welch does for the
+        FFT), so narrow peaks are never missed between grid points.
+
+        Args:
+            df: Flight DataFrame with the time column
+            parameters: Numeric channels to analyse
+            max_frequencies: Maximum number of grid frequencies
+            oversampling: Grid points per frequency resolution of a segment
+            grid_budget: Maximum of frequencies x samples
+
+        Returns:
+            Tuple of (frequencies in Hz, {parameter: amplitudes}), scaled
+            like amplitude_spectrum so a sine of amplitude A peaks near A
+        """
+        time = df[self.time_column].to_numpy(dtype=np.float64, na_value=np.nan)
+        finite = np.sort(time[np.isfinite(time)])
+        intervals = np.diff(finite)
+        intervals = intervals[intervals > 0]
+        if len(intervals) == 0:
+            return np.array([]), {param: np.array([]) for param in parameters}
+
+        span = finite[-1] - finite[0]
+        nyquist = 0.5 / np.median(intervals)
+        count = max(1, int(min(nyquist * span * oversampling, max_frequencies,
+                               max(64, grid_budget // len(finite)))))
+        frequencies = np.arange(1, count + 1) * (nyquist / count)
+        segment = count / (oversampling * nyquist)
+
+        settings = ('lomb', count, float(nyquist), float(segment))
+        return self._cached(df, parameters, 'none', None, settings,
+                            lambda block, dt: self._lomb_block(block, time, frequencies, segment))
+
+    def cross_correlation(self, df: pd.DataFrame, reference: str, parameters: List[str],
+                          max_lag: Optional[float] = None, detrend: str = 'constant',
+                          nan_policy: str = 'interpolate') -> Tuple[np.ndarray, Dict[str, Dict[str, Any]]]:
+        """
+        Normalized cross-correlation of channels against one reference channel.
+
+        The reference is transformed once and every other channel of a
+        batch with one zero-padded real FFT, so full lag curves cost
+        O(n log n) per channel. A positive lag means the channel follows
+        the reference, e.g. a surface responding to a stick command.
+
+        Args:
+            df: Flight DataFrame with the time column
+            reference: Numeric reference channel
+            parameters: Numeric channels compared with the reference
+            max_lag: Largest lag in seconds kept in the curves (None for
+                the whole record)
+            detrend: One of DETREND_TYPES, removed before correlating
+            nan_policy: One of NAN_POLICIES, see amplitude_spectrum
+
+        Returns:
+            Tuple of (lags in seconds, {parameter: {'curve': coefficients,
+            'lag': lag of the strongest |coefficient| in seconds, refined
+            between samples, 'coefficient': its value}})
+        """
+        dt = self.sample_interval(df)
+        if not np.isfinite(dt) or dt <= 0:
+            return np.array([]), {param: {'curve': np.array([]), 'lag': np.nan, 'coefficient': np.nan}
+                                  for param in parameters}
+        lags = len(df) - 1 if max_lag is None else min(len(df) - 1, int(round(max_lag / dt)))
+        target = self._prepare_block(df, [reference], detrend, nan_policy)[0]
+        settings = ('xcorr', DataCache.frame_key(df, [self.time_column, reference]), reference, lags)
+        return self._cached(df, parameters, detrend, nan_policy, settings,
+                            lambda block, dt: self._xcorr_block(block, target, dt, lags))
+
+    def sample_interval(self, df: pd.DataFrame) -> float:
+        """
+        Mean sample interval of the time column, in seconds.
+        """
+        time = df[self.time_column].to_numpy(dtype=np.float64, na_value=np.nan)
+        time = time[np.isfinite(time)]
+        if len(time) < 2:
+            return np.nan
+        return (time[-1] - time[0]) / (len(time) - 1)
+
+    def _start_time(self, df: pd.DataFrame) -> float:
+        """First finite value of the time column."""
+        time = df[self.time_column].to_numpy(dtype=np.float64, na_value=np.nan)
+        finite = time[np.isfinite(time)]
+        return float(finite[0]) if len(finite) else 0.0
+
+    def _cached(self, df: pd.DataFrame, parameters: List[str], detrend: str, nan_policy: str,
+                settings: Tuple, compute) -> Tuple[np.ndarray, Dict[str, Any]]:
+        """
+        Look up per-channel results and compute the missing ones in batches.
+
+        Args:
+            df: Flight DataFrame
+            parameters: Channels to analyse
+            detrend, nan_policy: Preparation of the channels, see amplitude_spectrum
+            settings: Hashable analysis name and options, part of the cache key
+            compute: Callable(block, dt) returning (axis, [result per row])
+                for a prepared (channels x samples) block
+
+        Returns:
+            Tuple of (shared axis, {parameter: result})
+        """
+        keys = {param: (DataCache.frame_key(df, [self.time_column, param]), param,
+                        detrend, nan_policy) + settings
+                for param in parameters}
+        # Hits are read first, so computing the misses cannot evict them
+        entries = {param: self._cache.get(keys[param]) for param in parameters}
+        missing = [param for param in parameters if entries[param] is None]
+
+        dt = self.sample_interval(df)
+        for start in range(0, len(missing), self.block_channels):
+            batch = missing[start:start + self.block_channels]
+            block = self._prepare_block(df, batch, detrend, nan_policy)
+            axis, results = compute(block, dt)
+            for param, result in zip(batch, results):
+                entries[param] = (axis, result)
+                self._cache.put(keys[param], entries[param])
+
+        axis, spectra = np.array([]), {}
+        for param in parameters:
+            axis, spectra[param] = entries[param]
+        return axis, spectra
+
+    def _prepare_block(self, df: pd.DataFrame, parameters: List[str], detrend: str,
+                       nan_policy: str) -> np.ndarray:
+        """
+        Stack channels into a (channels x samples) float64 block with gaps
+        filled (left as NaN when ``nan_policy`` is None) and trends removed.
+        Channels without valid samples stay NaN.
+
+        Each channel is a contiguous row, which is the fastest layout for
+        transforms along the time axis.
+        """
+        rows = len(df)
+        block = np.empty((len(parameters), rows), dtype=np.float64)
+        dead = np.zeros(len(parameters), dtype=bool)
+        positions = np.arange(rows)
+
+        for j, param in enumerate(parameters):
+            column = df[param].to_numpy(dtype=np.float64, na_value=np.nan)
+            valid = np.isfinite(column)
+            if not valid.any():
+                dead[j] = True
+                column = np.zeros(rows)
+            elif not valid.all() and nan_policy is not None:
+                column = column.copy()
+                if nan_policy == 'interpolate':
+                    column[~valid] = np.interp(positions[~valid], positions[valid], column[valid])
+                else:
+                    column[~valid] = column[valid].mean()
+            block[j] = column
+
+        if detrend != 'none' and rows > 1:
+            block = remove_trend(block, axis=-1, type=detrend, overwrite_data=True)
+        block[dead] = np.nan
+        return block
+
+    def _amplitude_block(self, block: np.ndarray, dt: float,
+                         window: str) -> Tuple[np.ndarray, List[np.ndarray]]:
+        """
+        Windowed, zero-padded real FFT of every channel of a prepared block.
+        """
+        samples = block.shape[1]
+        if samples < 2 or not np.isfinite(dt) or dt <= 0:
+            return np.array([]), [np.array([]) for _ in range(len(block))]
+
+        taper = get_window(window, samples, fftbins=True)
+        n_fft = sp_fft.next_fast_len(samples, real=True)
+        block *= taper
+        spectrum = sp_fft.rfft(block, n=n_fft, axis=-1, workers=-1)
+
+        amplitude = np.abs(spectrum) * (2.0 / taper.sum())
+        # DC and Nyquist bins have no mirrored negative frequency
+        amplitude[:, 0] /= 2.0
+        if n_fft % 2 == 0:
+            amplitude[:, -1] /= 2.0
+
+        frequencies = sp_fft.rfftfreq(n_fft, dt)
+        return frequencies, list(amplitude)
+
+    def _psd_block(self, block: np.ndarray, dt: float, nperseg: int, noverlap: int, window: str,
+                   average: str, detrend: str) -> Tuple[np.ndarray, List[np.ndarray]]:
+        """
+        Welch PSD of every channel of a prepared block in one call.
+        """
+        if block.shape[1] < 2 or not np.isfinite(dt) or dt <= 0:
+            return np.array([]), [np.array([]) for _ in range(len(block))]
+
+        frequencies, psd = welch(block, fs=1.0 / dt, window=window, nperseg=nperseg,
+                                 noverlap=noverlap, detrend=False if detrend == 'none' else detrend,
+                                 average=average, axis=-1)
+        return frequencies, list(psd)
+
+    def _lomb_block(self, block: np.ndarray, time: np.ndarray, frequencies: np.ndarray,
+                    segment: float) -> Tuple[np.ndarray, List[np.ndarray]]:
+        """
+        Segment-averaged Lomb-Scargle amplitudes of every channel of a block with NaN gaps.
+
+        ``frequencies`` must be the multiples 1..n of the grid step. The
+        phasors exp(2j*pi*f*t) of a chunk of frequencies are built once for
+        all channels by repeated multiplication with the step phasor, which
+        is much cheaper than evaluating sin and cos, with t measured from
+        the start of each sample's segment. The periodogram sums over each
+        channel's valid samples in every segment are then one reduceat per
+        chunk.
+        """
+        keep = np.isfinite(time)
+        t, block = time[keep], block[:, keep]
+        order = np.argsort(t, kind='stable')
+        t, block = t[order], block[:, order]
+
+        # Segment boundaries, and times relative to each segment start
+        starts = t[0] + np.arange(max(1, int(np.ceil((t[-1] - t[0]) / segment)))) * segment
+        bounds = np.unique(np.searchsorted(t, starts, side='left'))
+        bounds = bounds[bounds < len(t)]
+        sizes = np.diff(np.append(bounds, len(t)))
+        t = t - np.repeat(t[bounds], sizes)
+
+        weight = np.isfinite(block)
+        # Channels with the same gaps share their sums of exp(2iwt)
+        pattern_index: Dict[bytes, int] = {}
+        pattern_of = np.array([pattern_index.setdefault(np.packbits(mask).tobytes(), len(pattern_index))
+                               for mask in weight], dtype=np.intp)
+        patterns = weight[np.unique(pattern_of, return_index=True)[1]]
+        data = np.where(weight, block, 0.0)
+        valid = np.add.reduceat(weight.astype(np.float64), bounds, axis=1)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = np.add.reduceat(data, bounds, axis=1) / valid
+        data = np.where(weight, data - np.repeat(mean, sizes, axis=1), 0.0)
+
+        channels, samples = block.shape
+        step = np.exp(2j * np.pi * frequencies[0] * t)
+        chunk = max(1, (1 << 20) // (samples * channels))
+        power = np.empty((channels, len(frequencies), len(bounds)))
+        phasor = step
+        for first in range(0, len(frequencies), chunk):
+            rows = min(chunk, len(frequencies) - first)
+            phasors = np.empty((rows, samples), dtype=np.complex128)
+            phasors[0] = phasor
+            for row in range(1, rows):
+                np.multiply(phasors[row - 1], step, out=phasors[row])
+            phasor = phasors[-1] * step
+
+            # Per segment: sum(y * exp(iwt)) and, over the valid samples
+            # only, sum(exp(2iwt))
+            projection = np.add.reduceat(data[:, None, :] * phasors, bounds, axis=2)
+            squares = np.square(phasors)
+            double = np.stack([np.add.reduceat(squares if mask.all() else np.where(mask, squares, 0.0),
+                                               bounds, axis=1)
+                               for mask in patterns])[pattern_of]
+
+            # Rotate by the phase offset tau that decouples the sine and cosine fits
+            rotated = projection * np.exp(-0.5j * np.angle(double))
+            doubled = np.abs(double)
+            cos_norm = 0.5 * (valid[:, None, :] + doubled)
+            sin_norm = 0.5 * (valid[:, None, :] - doubled)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                power[:, first:first + rows] = 0.5 * (
+                    np.square(rotated.real) / cos_norm +
+                    np.where(sin_norm > 1e-9 * valid[:, None, :], np.square(rotated.imag) / sin_norm, 0.0))
+
+        # Average the squared amplitudes of segments with enough samples
+        with np.errstate(invalid='ignore', divide='ignore'):
+            squared = 4.0 * power / valid[:, None, :]
+        squared[np.broadcast_to((valid < 3)[:, None, :], squared.shape)] = np.nan
+        with np.errstate(invalid='ignore'), warnings.catch_warnings():
+            warnings.simplefilter('ignore', RuntimeWarning)
+            amplitude = np.sqrt(np.nanmean(squared, axis=2))
+        return frequencies, list(amplitude)
+
+    def _xcorr_block(self, block: np.ndarray, reference: np.ndarray, dt: float,
+                     lags: int) -> Tuple[np.ndarray, List[Dict[str, Any]]]:
+        """
+        Cross-correlation curves of every channel of a prepared block with a prepared reference.
+        """
+        samples = block.shape[1]
+        n_fft = sp_fft.next_fast_len(2 * samples - 1, real=True)
+        # sum_t reference[t] * channel[t + k] for every lag k, wrapped around n_fft
+        spectrum = np.conj(sp_fft.rfft(reference, n=n_fft)) * sp_fft.rfft(block, n=n_fft, axis=-1, workers=-1)
+        circular = sp_fft.irfft(spectrum, n=n_fft, axis=-1, workers=-1)
+        curves = np.concatenate([circular[:, n_fft - lags:], circular[:, :lags + 1]], axis=1)
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            curves /= np.sqrt(np.square(reference).sum() * np.square(block).sum(axis=1))[:, None]
+        lag_axis = np.arange(-lags, lags + 1) * dt
+
+        results = []
+        for curve in curves:
+            if not np.isfinite(curve).any():
+                results.append({'curve': curve, 'lag': np.nan, 'coefficient': np.nan})
+                continue
+            peak = int(np.nanargmax(np.abs(curve)))
+            # Parabola through the peak and its neighbours places it between samples
+            offset = 0.0
+            if 0 < peak < len(curve) - 1:
+                left, centre, right = np.abs(curve[peak - 1:peak + 2])
+                curvature = left - 2.0 * centre + right
+                if curvature < 0:
+                    offset = 0.5 * (left - right) / curvature
+            results.append({'curve': curve, 'lag': float(lag_axis[peak] + offset * dt),
+                            'coefficient': float(curve[peak])})
+        return lag_axis, results
+
+    def _spectrogram_block(self, block: np.ndarray, dt: float, nperseg: int, hop: int,
+                           window: str, detrend: str, time_bins: int, freq_bins: int,
+                           start_time: float) -> Tuple[np.ndarray, List[Dict[str, np.ndarray]]]:
+        """
+        Binned STFT power of every channel of a prepared block.
+        """
+        samples = block.shape[1]
+        if samples < nperseg or not np.isfinite(dt) or dt <= 0:
+            empty = {'time': np.array([]), 'frequency': np.array([]), 'power_db': np.empty((0, 0))}
+            return np.array([]), [empty for _ in range(len(block))]
+
+        taper = get_window(window, nperseg, fftbins=True)
+        # One-sided power spectral density scaling, as scipy.signal.spectrogram
+        scale = np.full(nperseg // 2 + 1, 2.0 * dt / np.square(taper).sum())
+        scale[0] /= 2.0
+        if nperseg % 2 == 0:
+            scale[-1] /= 2.0
+
+        segments = (samples - nperseg) // hop + 1
+        per_column = -(-segments // time_bins)
+        columns = -(-segments // per_column)
+        per_row = -(-len(scale) // freq_bins)
+        rows = -(-len(scale) // per_row)
+
+        starts = np.arange(segments) * hop
+        centres = starts + nperseg / 2.0
+        counts = np.bincount(np.arange(segments) // per_column, minlength=columns)
+        row_counts = np.bincount(np.arange(len(scale)) // per_row, minlength=rows)
+        time = start_time + np.add.reduceat(centres, np.arange(columns) * per_column) / counts * dt
+        frequency = np.add.reduceat(sp_fft.rfftfreq(nperseg, dt), np.arange(rows) * per_row) / row_counts
+
+        # Whole image columns per chunk keep the working set near 8 MB
+        chunk_columns = max(1, (1 << 20) // (per_column * nperseg))
+        images = []
+        for channel in block:
+            frames = np.lib.stride_tricks.sliding_window_view(channel, nperseg)[::hop]
+            power = np.empty((columns, rows))
+            for first in range(0, columns, chunk_columns):
+                last = min(columns, first + chunk_columns)
+                chunk = frames[first * per_column:last * per_column]
+                if detrend != 'none':
+                    chunk = remove_trend(chunk, axis=-1, type=detrend)
+                spectrum = np.square(np.abs(sp_fft.rfft(chunk * taper, axis=-1))) * scale
+                # Average segments into columns, then frequencies into rows
+                column_power = np.add.reduceat(spectrum, np.arange(0, len(chunk), per_column), axis=0)
+                column_power /= counts[first:last, None]
+                power[first:last] = np.add.reduceat(column_power, np.arange(rows) * per_row,
+                                                    axis=1) / row_counts
+            # Floor exact zeros 200 dB below the peak so they do not stretch the
+            # colour scale; NaN channels stay NaN
+            peak = np.nanmax(power, initial=0.0)
+            floor = max(peak * 1e-20, np.finfo(np.float64).tiny)
+            power_db = 10.0 * np.log10(np.maximum(power.T, floor))
+            images.append({'time': time, 'frequency': frequency, 'power_db': power_db})
+        return frequency, images
@@ -0,0 +1,151 @@
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Any, Optional
+
+
+class TimeSeriesPyramid:
+    """
+    Multi-resolution min/max/mean aggregates of flight channels.
+
+    Level 0 aggregates ``base_bucket`` consecutive samples; every further
+    level halves the number of buckets by merging neighbouring pairs, so a
+    channel costs O(n) to build and about 12 bytes per ``base_bucket``
+    samples to keep. Channels are built the first time they are requested
+    and kept for the life of the pyramid, which the app stores alongside
+    the processed DataFrame.
+    """
+
+    def __init__(self, df: pd.DataFrame, x_axis: str = 'Elapsed Time (s)',
+                 base_bucket: int = 8, min_buckets: int = 256):
+        """
+        Args:
+            df: Processed flight DataFrame, sorted by ``x_axis``; its
+                ``attrs['source_key']`` identifies the dataset the pyramid
+                stands for
+            x_axis: Numeric time column the pyramid is indexed by
+            base_bucket: Samples per bucket at the finest level
+            min_buckets: Stop adding levels once a level has this few buckets
+        """
+        self.frame = df
+        self.source_key = df.attrs.get('source_key')
+        self.x_axis = x_axis
+        self.base_bucket = base_bucket
+        self.min_buckets = min_buckets
+        self.x = df[x_axis].to_numpy(dtype=np.float64, na_value=np.nan)
+
+        # Start time of every bucket, per level (shared by all channels)
+        self.x_levels: List[np.ndarray] = []
+        size = base_bucket
+        while True:
+            self.x_levels.append(self.x[::size])
+            if len(self.x_levels[-1]) <= min_buckets:
+                break
+            size *= 2
+
+        self._channels: Dict[str, List[Dict[str, np.ndarray]]] = {}
+
+    def __len__(self) -> int:
+        return len(self.x)
+
+    def covers(self, df: pd.DataFrame) -> bool:
+        """
+        Whether ``df`` holds the rows this pyramid was built from.
+
+        Frames are matched by their ``attrs['source_key']``; a pyramid built
+        from a frame without one only covers that frame object.
+        """
+        if self.source_key is None:
+            return df is self.frame
+        return df.attrs.get('source_key') == self.source_key and len(df) == len(self)
+
+    def __contains__(self, param: str) -> bool:
+        return param in self.frame.columns and pd.api.types.is_numeric_dtype(self.frame[param])
+
+    def bucket_size(self, level: int) -> int:
+        """Number of samples aggregated by one bucket at ``level``."""
+        return self.base_bucket * 2 ** level
+
+    def get_level(self, param: str, t0: Optional[float], t1: Optional[float],
+                  pixel_width: int) -> Dict[str, Any]:
+        """
+        Return the coarsest representation that still resolves a time window.
+
+        The chosen level has at least ``pixel_width`` buckets inside the
+        window; when even the finest level has fewer, the raw samples are
+        returned instead, so zoomed-in views show full-rate data.
+
+        Args:
+            param: Channel name
+            t0, t1: Window bounds on the x axis (None for the data bounds)
+            pixel_width: Horizontal resolution the window is drawn at
+
+        Returns:
+            Dictionary with 'level' (-1 for raw samples), 'bucket_size' and
+            the window's 'x' (bucket start times), 'min', 'max' and 'mean'
+        """
+        t0 = self.x[0] if t0 is None else t0
+        t1 = self.x[-1] if t1 is None else t1
+
+        raw_lo = np.searchsorted(self.x, t0, side='left')
+        raw_hi = np.searchsorted(self.x, t1, side='right')
+        chosen = -1
+        for level in range(len(self.x_levels) - 1, -1, -1):
+            if (raw_hi - raw_lo) / self.bucket_size(level) >= pixel_width:
+                chosen = level
+                break
+
+        if chosen < 0:
+            y = self.frame[param].to_numpy(dtype=np.float64, na_value=np.nan)[raw_lo:raw_hi]
+            return {'level': -1, 'bucket_size': 1, 'x': self.x[raw_lo:raw_hi],
+                    'min': y, 'max': y, 'mean': y}
+
+        starts = self.x_levels[chosen]
+        lo = max(0, np.searchsorted(starts, t0, side='right') - 1)
+        hi = np.searchsorted(starts, t1, side='right')
+        aggregates = self._channel(param)[chosen]
+        return {'level': chosen, 'bucket_size': self.bucket_size(chosen), 'x': starts[lo:hi],
+                'min': aggregates['min'][lo:hi], 'max': aggregates['max'][lo:hi],
+                'mean': aggregates['mean'][lo:hi]}
+
+    def _channel(self, param: str) -> List[Dict[str, np.ndarray]]:
+        """
+        Build (once) and return the levels of one channel.
+        """
+        if param not in self._channels:
+            self._channels[param] = self._build_levels(
+                self.frame[param].to_numpy(dtype=np.float64, na_value=np.nan))
+        return self._channels[param]
+
+    def _build_levels(self, y: np.ndarray) -> List[Dict[str, np.ndarray]]:
+        """
+        Aggregate a channel into every level; missing samples are ignored.
+        """
+        buckets = -(-len(y) // self.base_bucket)
+        padded = np.full(buckets * self.base_bucket, np.nan)
+        padded[:len(y)] = y
+        block = padded.reshape(buckets, self.base_bucket)
+
+        present = ~np.isnan(block)
+        low = np.fmin.reduce(block, axis=1)
+        high = np.fmax.reduce(block, axis=1)
+        total = np.where(present, block, 0.0).sum(axis=1)
+        count = present.sum(axis=1)
+
+        levels = []
+        for level in range(len(self.x_levels)):
+            if level > 0:
+                # Merge neighbouring buckets; an odd tail merges with an empty bucket
+                if len(low) % 2:
+                    low, high = np.append(low, np.nan), np.append(high, np.nan)
+                    total, count = np.append(total, 0.0), np.append(count, 0)
+                low = np.fmin(low[0::2], low[1::2])
+                high = np.fmax(high[0::2], high[1::2])
+                total = total[0::2] + total[1::2]
+                count = count[0::2] + count[1::2]
+
+            with np.errstate(invalid='ignore', divide='ignore'):
+                mean = total / count
+            levels.append({'min': low.astype(np.float32), 'max': high.astype(np.float32),
+                           'mean': mean.astype(np.float32)})
+
+        return levels
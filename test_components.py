@@ -4,8 +4,11 @@ Test script to verify the enhanced flight analyzer components work correctly.
 """
 
 import pandas as pd
+import numpy as np
 import sys
 import os
+import io
+import tempfile
 
 # Add the current directory to the path so we can import our components
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
@@ -14,6 +17,9 @@ from components.data_processor import DataProcessor
 from components.chart_manager import ChartManager
 from components.layout_manager import LayoutManager
 from components.export_manager import ExportManager
+from components.decimation import decimate
+from components.data_cache import DataCache, LRUCache
+from components.time_pyramid import TimeSeriesPyramid
 
 def test_data_processor():
     """Test the DataProcessor component."""
@@ -128,6 +134,246 @@ def test_export_manager(df):
     if validation['warnings']:
         print(f"⚠️ Warnings: {validation['warnings']}")
 
+def test_decimation():
+    """Test that decimated traces respect the point budget and keep spikes."""
+    print("\nTesting decimation...")
+    
+    elapsed = np.arange(360000) / 50.0  # Two hours at 50 Hz
+    values = np.sin(elapsed / 30.0)
+    values[123456] = 9.0
+    values[234567] = -7.5
+    
+    for method in ['lttb', 'minmax']:
+        idx = decimate(elapsed, values, 5000, method)
+        if len(idx) <= 5002 and 123456 in idx and 234567 in idx:
+            print(f"✅ {method}: {len(values)} → {len(idx)} points, spikes kept")
+        else:
+            print(f"❌ {method}: {len(idx)} points, spikes kept: {123456 in idx and 234567 in idx}")
+
+def test_frame_key():
+    """Test that cache keys see changes in every row, not just a sample."""
+    print("\nTesting frame keys...")
+    
+    frame = pd.DataFrame({'Elapsed Time (s)': np.arange(100000) / 50.0,
+                          'B (deg)': np.full(100000, np.nan)})
+    changed = frame.copy()
+    changed.loc[1234, 'B (deg)'] = 7.5
+    
+    if DataCache.frame_key(frame) != DataCache.frame_key(changed):
+        print("✅ Frames differing in one row get different keys")
+    else:
+        print("❌ Frames differing in one row share a key")
+    
+    # Loaded frames are identified by their source key instead of their values
+    frame.attrs['source_key'] = 'flight-1'
+    other = frame.copy()
+    other.attrs['source_key'] = 'flight-2'
+    keys = {DataCache.frame_key(frame), DataCache.frame_key(frame.copy()),
+            DataCache.frame_key(frame, ['B (deg)'])}
+    if len(keys) == 2 and DataCache.frame_key(other) not in keys:
+        print("✅ Source keys identify loaded frames and their column subsets")
+    else:
+        print("❌ Source keys do not identify loaded frames")
+
+def test_figure_cache():
+    """Test that cached figures are never reused for frames with different data."""
+    print("\nTesting figure cache...")
+    
+    elapsed = np.arange(100000) / 100.0
+    frame = pd.DataFrame({'Elapsed Time (s)': elapsed, 'Load (g)': np.sin(elapsed)})
+    spiked = frame.copy()
+    spiked.loc[12345, 'Load (g)'] = 9.0
+    config = {'id': 'cache_test', 'type': 'line', 'parameters': ['Load (g)'],
+              'x_axis': 'Elapsed Time (s)', 'decimation': 'minmax'}
+    
+    chart_manager = ChartManager()
+    first = chart_manager.create_chart(frame, config)
+    second = chart_manager.create_chart(spiked, config)
+    if second is not first and np.nanmax(np.asarray(second.data[0].y)) == 9.0:
+        print("✅ Changed frame builds its own figure with the spike")
+    else:
+        print("❌ Changed frame got the cached figure")
+
+def test_bar_bins():
+    """Test that bar aggregates show interval peaks and are cached per frame."""
+    print("\nTesting bar aggregates...")
+    
+    elapsed = np.arange(100000) / 50.0
+    frame = pd.DataFrame({'Elapsed Time (s)': elapsed, 'Load (g)': np.sin(elapsed)})
+    spiked = frame.copy()
+    spiked.loc[12345, 'Load (g)'] = 9.0
+    
+    chart_manager = ChartManager()
+    before = chart_manager.bar_bins(frame, 'Elapsed Time (s)', 'Load (g)')['max']
+    after = chart_manager.bar_bins(spiked, 'Elapsed Time (s)', 'Load (g)')['max']
+    if np.nanmax(before) <= 1.0 and np.nanmax(after) == 9.0:
+        print(f"✅ Max bars show the interval peak ({len(after)} bars)")
+    else:
+        print(f"❌ Max bars peak at {np.nanmax(after)}, expected 9.0")
+
+def test_cached_diagnostics():
+    """Test that a disk-cache hit restores the same load diagnostics as a fresh load."""
+    print("\nTesting cached load diagnostics...")
+    
+    lines = ["Description,A,B,C", "EU,deg,deg,g"]
+    for i in range(200):
+        fields = [f"198:09:40:{i * 0.05:06.3f}", f"{i * 0.1:.3f}", "1.0", "2.0"]
+        if i in (10, 11):
+            fields.append("9.9")  # Extra column
+        elif i == 50:
+            fields = fields[:2]  # Missing columns
+        lines.append(",".join(fields))
+    content = "\n".join(lines).encode('utf-8')
+    
+    with tempfile.TemporaryDirectory() as cache_dir:
+        fresh = DataProcessor(cache=DataCache(cache_dir))
+        fresh.load_data(io.BytesIO(content))
+        cached = DataProcessor(cache=DataCache(cache_dir))
+        cached.load_data(io.BytesIO(content))
+    
+    if fresh.diagnostics and cached.diagnostics == fresh.diagnostics:
+        print(f"✅ Cached diagnostics match: {fresh.diagnostics['rows']['column_count_histogram']}")
+    else:
+        print(f"❌ Cached diagnostics differ: {cached.diagnostics} != {fresh.diagnostics}")
+
+def test_compact_dtypes():
+    """Test that compact mode only gives 0/1 channels an integer type when their limits allow it."""
+    print("\nTesting compact dtypes...")
+    
+    processor = DataProcessor(compact_dtypes=True)
+    flags = np.array([0.0, 1.0, 1.0, 0.0])
+    discrete = processor._compact_array("AHRS_L270_ISM_GPS_FIX (ADM)", flags)
+    still = processor._compact_array("AHRS_L327_BODY_ROLL_RATE (deg/s)", flags)
+    counter = processor._compact_array("COUNTER", np.array([0.0, 3.0, 300.0]))
+    
+    if discrete.dtype == np.uint8 and still.dtype.kind == 'f' and counter.dtype == np.uint16:
+        print(f"✅ Compact dtypes: {discrete.dtype}, {still.dtype}, {counter.dtype}")
+    else:
+        print(f"❌ Compact dtypes: {discrete.dtype}, {still.dtype}, {counter.dtype}")
+
+def test_ragged_padding():
+    """Test that short rows pad text columns with empty strings and numeric columns with NaN."""
+    print("\nTesting ragged row padding...")
+    
+    lines = ["Description,A,B,C", "EU,deg,-,g"]
+    for i in range(200):
+        fields = [f"198:09:40:{i * 0.05:06.3f}", f"{i * 0.1:.3f}", "ON" if i % 2 else "OFF", "2.0"]
+        if i == 50:
+            fields = fields[:2]  # Missing columns
+        lines.append(",".join(fields))
+    df = DataProcessor().load_data(io.BytesIO("\n".join(lines).encode('utf-8')))
+    
+    text, number = df['B'].iloc[50], df['C (g)'].iloc[50]
+    if text == '' and pd.isna(number):
+        print("✅ Short row padded with '' (text) and NaN (numeric)")
+    else:
+        print(f"❌ Short row padded with {text!r} (text) and {number!r} (numeric)")
+
+def test_pyramid_source():
+    """Test that the pyramid only serves the dataset it was built from."""
+    print("\nTesting pyramid source matching...")
+    
+    n = 100_000
+    elapsed = np.arange(n) * 0.01
+    flight = pd.DataFrame({'Elapsed Time (s)': elapsed, 'A': np.sin(elapsed)})
+    flight.attrs['source_key'] = 'flight-1'
+    other = pd.DataFrame({'Elapsed Time (s)': elapsed, 'A': np.zeros(n)})
+    other.attrs['source_key'] = 'flight-2'
+    
+    chart_manager = ChartManager()
+    chart_manager.set_pyramid(TimeSeriesPyramid(flight))
+    _, y = chart_manager._decimated_xy(other, 'Elapsed Time (s)', 'A', 'minmax', 2000,
+                                       x_range=(0.0, elapsed[-1]))
+    
+    if np.nanmax(np.abs(y)) == 0.0:
+        print("✅ Frame of another dataset is drawn from its own samples")
+    else:
+        print(f"❌ Frame of another dataset drawn from the pyramid (peak {np.nanmax(np.abs(y)):.3f})")
+
+def test_resample_dropouts():
+    """Test that resampling leaves long dropouts missing and bridges short ones."""
+    print("\nTesting resampling across dropouts...")
+    
+    elapsed = np.arange(0, 60, 0.05)
+    keep = (elapsed < 20) | (elapsed >= 30)  # 10 s recorder dropout
+    keep[800] = False  # Single missed sample
+    df = pd.DataFrame({'Elapsed Time (s)': elapsed[keep], 'A': np.sin(elapsed[keep])})
+    df['B'] = np.where(np.arange(len(df)) % 4 == 0, df['A'], np.nan)  # Slower bus
+    
+    processor = DataProcessor()
+    results = {method: processor.resample_uniform(df, ['A', 'B'], rate=20.0, method=method)
+               for method in ('linear', 'previous')}
+    ok = True
+    for method, result in results.items():
+        grid = result['Elapsed Time (s)'].to_numpy()
+        inside = (grid >= 20.0) & (grid < 30.0)
+        outside = ((grid < 19.5) | (grid > 30.5)) & (grid >= 0.5) & (grid <= 59.0)
+        for param in ('A', 'B'):
+            values = result[param].to_numpy()
+            ok &= bool(np.isnan(values[inside]).all() and np.isfinite(values[outside]).all())
+    error = np.nanmax(np.abs(results['linear']['A'].to_numpy() - np.sin(grid)))
+    
+    if ok and error < 0.01:
+        print(f"✅ 10 s dropout left missing, short gaps bridged (max error {error:.4f})")
+    else:
+        print(f"❌ Dropout handling wrong (max error {error:.4f})")
+
+def test_scatter_auto_mode():
+    """Test that automatic density mode counts only the numeric parameters."""
+    print("\nTesting scatter auto mode...")
+    
+    n = 150_000
+    df = pd.DataFrame({'Elapsed Time (s)': np.arange(n) * 0.05, 'A': np.random.rand(n),
+                       'MODE': np.array(['CRUISE', 'CLIMB'] * (n // 2))})
+    fig = ChartManager()._create_scatter_chart(df, 'Elapsed Time (s)', ['A', 'MODE'],
+                                               'Scatter', 'Value', 'viridis')
+    
+    if [trace.type for trace in fig.data] == ['scatter', 'scatter']:
+        print(f"✅ {n:,} numeric points stay markers next to a text parameter")
+    else:
+        print(f"❌ Chart switched to {[trace.type for trace in fig.data]}")
+
+def test_streaming_late_channel():
+    """Test that streamed loads decide numeric channels over the whole file, like load_data."""
+    print("\nTesting streamed channel types...")
+    
+    lines = ["Description,A,LATE,MODE", "EU,deg,g,-"]
+    for i in range(3000):
+        late = "" if i < 400 else ("bad" if i == 1500 else f"{i * 0.01:.2f}")  # Powers up late
+        mode = "CRUISE" if i % 3 else "1.50"
+        lines.append(f"198:{i // 72000:02d}:{i // 1200 % 60:02d}:{i * 0.05 % 60:06.3f},"
+                     f"{i * 0.1:.3f},{late},{mode}")
+    content = "\n".join(lines).encode('utf-8')
+    
+    full = DataProcessor().load_data(io.BytesIO(content))
+    store = DataProcessor().load_data_streaming(io.BytesIO(content), chunk_rows=500)
+    streamed = store.to_dataframe()
+    
+    same = (streamed['LATE (g)'].dtype == full['LATE (g)'].dtype and
+            not pd.api.types.is_numeric_dtype(streamed['MODE']) and
+            all(streamed[col].astype(str).equals(full[col].astype(str)) for col in ('LATE (g)', 'MODE')))
+    if same:
+        print(f"✅ Streamed channels match load_data: LATE {streamed['LATE (g)'].dtype}, "
+              f"MODE {streamed['MODE'].dtype}")
+    else:
+        print(f"❌ Streamed channels differ: LATE {streamed['LATE (g)'].dtype}, MODE {streamed['MODE'].dtype}")
+
+def test_lru_cache():
+    """Test that the shared LRU cache honours its entry and byte bounds."""
+    print("\nTesting LRU cache...")
+    
+    cache = LRUCache(max_entries=3, max_bytes=100)
+    for key in 'abc':
+        cache.put(key, key.upper(), 30)
+    cache.get('a')  # 'b' is now the least recently used entry
+    cache.put('d', 'D', 30)
+    oversized = cache.put('e', 'E', 101)
+    
+    if 'b' not in cache and cache.get('a') == 'A' and not oversized and len(cache) == 3 and cache.nbytes == 90:
+        print("✅ Least recently used entry evicted, oversized value rejected")
+    else:
+        print(f"❌ Unexpected cache state: {len(cache)} entries, {cache.nbytes} bytes")
+
 def main():
     """Run all component tests."""
     print("Enhanced Flight Data Analyzer - Component Testing")
@@ -140,6 +386,18 @@ def main():
     test_chart_manager(df)
     test_layout_manager(df)
     test_export_manager(df)
+    test_decimation()
+    test_frame_key()
+    test_figure_cache()
+    test_bar_bins()
+    test_cached_diagnostics()
+    test_compact_dtypes()
+    test_ragged_padding()
+    test_pyramid_source()
+    test_resample_dropouts()
+    test_scatter_auto_mode()
+    test_streaming_late_channel()
+    test_lru_cache()
     
     print("\n" + "=" * 50)
     print("Component testing completed!")